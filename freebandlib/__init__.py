@@ -10,29 +10,92 @@
 This package provides the user-facing functionality of freebandlib
 """
 
+from .cache import (
+    CacheInfo,
+    cache_clear,
+    cache_info,
+    cached,
+    disable_cache,
+    disable_disk_cache,
+    enable_cache,
+    enable_disk_cache,
+)
+
+from .disk_cache import DiskCache
+
 from .digraph import (
     digraph_is_reachable,
     digraph_reverse,
     digraph_topological_order,
 )
 
-from .equality import equal_in_free_band, equivalent_transducers
+from .element import FreeBandElement
+
+from .equality import (
+    EqualityIndex,
+    classify_transducers,
+    classify_words,
+    equal_in_free_band,
+    equivalent_transducers,
+    join_words,
+)
+
+from .minword import (
+    MinWordIndex,
+    classify_cases,
+    compare_min_words,
+    iter_min_word,
+    min_word,
+    min_word_length,
+    min_word_letter_counts,
+    min_word_slp,
+    min_words,
+    normal_form,
+    normal_forms,
+    sort_elements,
+)
 
-from .minword import min_word
+from .multiply import (
+    MultiplicationProfile,
+    multiply,
+    multiply_generators,
+    multiply_letter,
+    multiply_many,
+    multiply_scan,
+)
 
-from .multiply import multiply
+from .slp import StraightLineProgram
+
+from .store import ElementStore
 
 from .transducer import (
+    SpineIndex,
     Transducer,
+    transducer_canonical_encoding,
     transducer_connected_states,
     transducer_cont,
+    transducer_fingerprint,
+    transducer_fingerprints,
+    transducer_from_bytes,
+    transducer_index_spines,
     transducer_minimize,
     transducer_isomorphism,
     transducer_topological_order,
     transducer_induced_subtransducer,
+    transducer_spine_state,
+    transducer_to_bytes,
     treelike_transducer,
     interval_transducer,
     minimal_transducer,
 )
 
-from .words import cont, pref_ltof, suff_ftol, word_function
+from .words import (
+    cont,
+    first_occurrence_order,
+    last_occurrence_order,
+    pref_ltof,
+    suff_ftol,
+    word_from_bytes,
+    word_function,
+    word_to_bytes,
+)
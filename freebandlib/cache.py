@@ -0,0 +1,289 @@
+"""An opt-in cache for the results of expensive functions.
+
+The cache is disabled by default, and is enabled by calling
+:func:`enable_cache`. Once enabled, the results of the functions decorated
+with :func:`cached`, such as :func:`minimal_transducer`,
+:func:`equal_in_free_band` and :func:`multiply`, are stored in a single least
+recently used cache with a bounded total size.
+
+The results of some of these functions, such as :func:`minimal_transducer`
+and :func:`normal_form`, can also be stored in a file that persists between
+runs, by calling :func:`enable_disk_cache`.
+"""
+
+from collections import OrderedDict
+from functools import wraps
+from hashlib import blake2b
+from typing import Any, Callable, Hashable, NamedTuple, Optional, Tuple
+
+from freebandlib.disk_cache import DiskCache
+
+# The version of the encodings, and of the functions, of the results stored in
+# the persistent cache, which is part of every key. It must be incremented
+# whenever an encoding, or the result of a cached function, changes, so that
+# the entries written by earlier versions are never read.
+_DISK_FORMAT = 1
+
+
+class CacheInfo(NamedTuple):
+    """Statistics about the cache, see :func:`cache_info`."""
+
+    hits: int
+    misses: int
+    nr_entries: int
+    size: int
+    max_size: int
+
+
+class _LRUCache:
+    # A least recently used cache, in which every entry has a size, and the
+    # least recently used entries are evicted whenever the total size exceeds
+    # max_size.
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.entries: OrderedDict[Hashable, Tuple[Any, int]] = OrderedDict()
+
+    def lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return True, entry[0]
+
+    def insert(self, key: Hashable, value: Any, size: int) -> None:
+        if size > self.max_size:
+            return
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.size -= old[1]
+        self.entries[key] = (value, size)
+        self.size += size
+        self.evict()
+
+    def evict(self) -> None:
+        while self.size > self.max_size:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.size -= evicted_size
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.size = self.hits = self.misses = 0
+
+
+_cache: Optional[_LRUCache] = None
+
+
+def enable_cache(max_size: int = 1 << 22) -> None:
+    """Enable the cache, or change its maximum size if it is enabled.
+
+    Parameters
+    ----------
+    max_size: int, default=2 ** 22
+        The maximum total size of the entries in the cache. The size of an
+        entry is roughly the number of letters in its arguments plus the
+        number of states of its value, so that the memory used by the cache is
+        proportional to `max_size`.
+
+    Raises
+    ------
+    RuntimeError
+        If `max_size` is negative.
+
+    Notes
+    -----
+    If the cache is already enabled, then its entries and statistics are
+    kept, and the least recently used entries are evicted until the total
+    size is at most `max_size`.
+    """
+    global _cache
+    if max_size < 0:
+        raise RuntimeError(f"expected a non-negative integer, found {max_size}")
+    if _cache is None:
+        _cache = _LRUCache(max_size)
+        return
+    _cache.max_size = max_size
+    _cache.evict()
+
+
+def disable_cache() -> None:
+    """Disable the cache and discard all of its entries and statistics."""
+    global _cache
+    _cache = None
+
+
+def cache_clear() -> None:
+    """Discard all of the entries and statistics of the cache, if enabled."""
+    if _cache is not None:
+        _cache.clear()
+
+
+def cache_info() -> Optional[CacheInfo]:
+    """Return statistics about the cache.
+
+    Returns
+    -------
+    Optional[CacheInfo]
+        The number of hits and misses since the cache was enabled or cleared,
+        the number of entries, their total size and the maximum size of the
+        cache, or `None` if the cache is disabled.
+    """
+    if _cache is None:
+        return None
+    return CacheInfo(
+        _cache.hits,
+        _cache.misses,
+        len(_cache.entries),
+        _cache.size,
+        _cache.max_size,
+    )
+
+
+_disk_cache: Optional[DiskCache] = None
+
+
+def enable_disk_cache(path: str, max_size: int = 1 << 30) -> DiskCache:
+    """Enable the persistent cache, stored in a file.
+
+    Parameters
+    ----------
+    path: str
+        The path of the file, which is created if it does not exist.
+    max_size: int, default=2 ** 30
+        The maximum total size of the entries in the file, in bytes.
+
+    Returns
+    -------
+    DiskCache
+        The persistent cache.
+
+    Raises
+    ------
+    RuntimeError
+        If `max_size` is negative.
+
+    Notes
+    -----
+    The results of the functions decorated with :func:`cached` that can be
+    encoded as bytes are looked up in the file if they are not found in the
+    in-memory cache of :func:`enable_cache`, and are added to the file if they
+    are not found there either. The persistent cache can be enabled with or
+    without the in-memory cache. If the persistent cache is already enabled,
+    then it is closed and replaced.
+
+    The keys in the file include the version of the format of the stored
+    results, so the entries written by a version of ``freebandlib`` with a
+    different format are never read, and are eventually evicted.
+    """
+    global _disk_cache
+    disk_cache = DiskCache(path, max_size)
+    disable_disk_cache()
+    _disk_cache = disk_cache
+    return disk_cache
+
+
+def disable_disk_cache() -> None:
+    """Disable the persistent cache, without removing its file."""
+    global _disk_cache
+    if _disk_cache is not None:
+        _disk_cache.close()
+    _disk_cache = None
+
+
+def _disk_key(name: str, key: Hashable) -> bytes:
+    # The key in the persistent cache of the value of key for the function
+    # name, which only depends on _DISK_FORMAT and the representation of key,
+    # so that it is the same in every run.
+    return blake2b(
+        repr((_DISK_FORMAT, name, key)).encode(), digest_size=16
+    ).digest()
+
+
+def cached(
+    key: Callable[..., Hashable],
+    size: Callable[..., int],
+    copy: Callable[[Any], Any] = lambda value: value,
+    encode: Optional[Callable[[Any], bytes]] = None,
+    decode: Optional[Callable[[bytes], Any]] = None,
+    store: Optional[Callable[[Any], Any]] = None,
+) -> Callable[[Callable], Callable]:
+    """Return a decorator caching the results of a function.
+
+    Parameters
+    ----------
+    key: Callable[..., Hashable]
+        A function taking the same arguments as the decorated function, and
+        returning a key such that calls with equal keys have equal results.
+    size: Callable[..., int]
+        A function taking the result followed by the arguments of the
+        decorated function, and returning the size of the entry.
+    copy: Callable[[Any], Any], default=the identity
+        A function copying a result, which is applied to every result
+        returned from the decorated function, so that modifying the returned
+        values does not modify the cache.
+    encode: Optional[Callable[[Any], bytes]], default=None
+        A function encoding a result as bytes, or `None` if the results are
+        not stored in the persistent cache, see :func:`enable_disk_cache`.
+        In the former case, the representation of every key must be the same
+        in every run.
+    decode: Optional[Callable[[bytes], Any]], default=None
+        The inverse of `encode`.
+    store: Optional[Callable[[Any], Any]], default=None
+        A function converting a result to the value kept in the in-memory
+        cache, or `None` to keep the result itself. In the former case,
+        `copy` is applied to the values kept in the cache, and must convert
+        them back to results.
+
+    Returns
+    -------
+    Callable[[Callable], Callable]
+        A decorator.
+
+    Notes
+    -----
+    If both caches are disabled, the decorated function calls the original
+    function directly. The keys of different functions never clash, as the
+    name of the function is part of the key.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            disk_cache = _disk_cache if encode is not None else None
+            if _cache is None and disk_cache is None:
+                return func(*args, **kwargs)
+            full_key = (name, key(*args, **kwargs))
+            if _cache is not None:
+                found, value = _cache.lookup(full_key)
+                if found:
+                    return copy(value)
+            if disk_cache is not None:
+                assert encode is not None and decode is not None
+                disk_key = _disk_key(*full_key)
+                data = disk_cache.get(disk_key)
+                if data is not None:
+                    value = decode(data)
+                else:
+                    value = func(*args, **kwargs)
+                    disk_cache.put(disk_key, encode(value))
+            else:
+                value = func(*args, **kwargs)
+            if _cache is None:
+                return value
+            entry_size = size(value, *args, **kwargs)
+            if store is not None:
+                _cache.insert(full_key, store(value), entry_size)
+                return value
+            _cache.insert(full_key, value, entry_size)
+            return copy(value)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,227 @@
+"""A persistent cache of bytes stored in a file.
+
+A :class:`DiskCache` is a key-value store backed by an SQLite database, in
+which both the keys and the values are bytes. It is used by :func:`cached`
+to keep the results of functions such as :func:`minimal_transducer` and
+:func:`normal_form` between runs, see :func:`enable_disk_cache`.
+"""
+
+import os
+import sqlite3
+import time
+from typing import List, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key BLOB PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+CREATE TABLE IF NOT EXISTS total (size INTEGER NOT NULL);
+INSERT INTO total SELECT 0 WHERE NOT EXISTS (SELECT * FROM total);
+"""
+
+# The number of lookups whose times of use are recorded in one transaction.
+_MAX_PENDING = 1024
+
+
+class DiskCache:
+    """A least recently used key-value store kept in a file.
+
+    Parameters
+    ----------
+    path: str
+        The path of the database file, which is created if it does not exist.
+    max_size: int, default=2 ** 30
+        The maximum total size of the entries, in bytes.
+
+    Attributes
+    ----------
+    hits: int
+        The number of lookups by this object that found a value.
+    misses: int
+        The number of lookups by this object that did not find a value.
+
+    Raises
+    ------
+    RuntimeError
+        If `max_size` is negative.
+
+    Notes
+    -----
+    The database uses write-ahead logging, so any number of processes can read
+    from the same file while another one is writing to it, and writes are
+    serialized by SQLite. Every process opens its own connection the first
+    time it uses the cache, so a cache created before forking, or pickled and
+    sent to another process, can be used by other processes.
+
+    The size of an entry is the total length of its key and value. When an
+    entry is added and the total size exceeds `max_size`, the least recently
+    used entries are removed. The times at which entries are used by lookups
+    are recorded in batches, to avoid writing to the database on every
+    lookup, so they are only approximate.
+    """
+
+    def __init__(self, path: str, max_size: int = 1 << 30):
+        if max_size < 0:
+            raise RuntimeError(
+                f"expected a non-negative integer, found {max_size}"
+            )
+        self.path = path
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._pid: Optional[int] = None
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pending: List[bytes] = []
+        self._connect()
+
+    def __getstate__(self):
+        """Return the path and maximum size, for pickling."""
+        return (self.path, self.max_size)
+
+    def __setstate__(self, state):
+        """Restore an unpickled cache, which opens its own connection."""
+        self.path, self.max_size = state
+        self.hits = 0
+        self.misses = 0
+        self._pid = None
+        self._connection = None
+        self._pending = []
+
+    def _connect(self) -> sqlite3.Connection:
+        # Return the connection of this process, opening it if necessary.
+        if self._connection is not None and self._pid == os.getpid():
+            return self._connection
+        connection = sqlite3.connect(self.path, timeout=60)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with connection:
+            connection.executescript(_SCHEMA)
+        self._connection = connection
+        self._pid = os.getpid()
+        self._pending = []
+        return connection
+
+    def _flush(self, connection: sqlite3.Connection) -> None:
+        # Record the times of use of the pending lookups.
+        if len(self._pending) == 0:
+            return
+        now = time.time()
+        with connection:
+            connection.executemany(
+                "UPDATE entries SET last_used = ? WHERE key = ?",
+                [(now, key) for key in self._pending],
+            )
+        self._pending = []
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        """Return the value of a key.
+
+        Parameters
+        ----------
+        key: bytes
+            A key.
+
+        Returns
+        -------
+        Optional[bytes]
+            The value of `key`, or `None` if `key` is not in the cache.
+        """
+        connection = self._connect()
+        row = connection.execute(
+            "SELECT value FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._pending.append(key)
+        if len(self._pending) >= _MAX_PENDING:
+            self._flush(connection)
+        return row[0]
+
+    def put(self, key: bytes, value: bytes) -> None:
+        """Set the value of a key, unless it is already set.
+
+        Parameters
+        ----------
+        key: bytes
+            A key.
+        value: bytes
+            The value of `key`.
+
+        Notes
+        -----
+        The value of a key is assumed to never change, so if `key` is already
+        in the cache, for example because another process added it, then its
+        value is not replaced. Entries larger than `max_size` are not added.
+        """
+        size = len(key) + len(value)
+        if size > self.max_size:
+            return
+        connection = self._connect()
+        self._flush(connection)
+        with connection:
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time()),
+            )
+            if cursor.rowcount == 0:
+                return
+            connection.execute("UPDATE total SET size = size + ?", (size,))
+            self._evict(connection)
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        # Remove the least recently used entries until the total size is at
+        # most max_size, inside the transaction of the caller.
+        (total,) = connection.execute("SELECT size FROM total").fetchone()
+        while total > self.max_size:
+            rows = connection.execute(
+                "SELECT key, size FROM entries ORDER BY last_used LIMIT 64"
+            ).fetchall()
+            if len(rows) == 0:
+                total = 0
+                break
+            removed = []
+            for key, size in rows:
+                if total <= self.max_size:
+                    break
+                removed.append((key,))
+                total -= size
+            connection.executemany("DELETE FROM entries WHERE key = ?", removed)
+        connection.execute("UPDATE total SET size = ?", (total,))
+
+    @property
+    def nr_entries(self) -> int:
+        """The number of entries in the cache."""
+        connection = self._connect()
+        return connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @property
+    def size(self) -> int:
+        """The total size of the entries in the cache, in bytes."""
+        connection = self._connect()
+        return connection.execute("SELECT size FROM total").fetchone()[0]
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        connection = self._connect()
+        self._pending = []
+        with connection:
+            connection.execute("DELETE FROM entries")
+            connection.execute("UPDATE total SET size = 0")
+
+    def close(self) -> None:
+        """Record the pending times of use and close the connection.
+
+        The cache can still be used afterwards, in which case the connection
+        is opened again.
+        """
+        if self._connection is None or self._pid != os.getpid():
+            return
+        self._flush(self._connection)
+        self._connection.close()
+        self._connection = None
@@ -0,0 +1,207 @@
+"""Elements of free bands as values.
+
+A :class:`FreeBandElement` wraps the minimal transducer of an element, so that
+elements can be multiplied with `*`, compared with `==`, and used in sets and
+as keys of dictionaries, without computing isomorphisms or short-lex least
+words more than once.
+"""
+
+from __future__ import annotations
+
+from typing import FrozenSet, Optional, Tuple
+
+from freebandlib.minword import min_word, min_word_length
+from freebandlib.multiply import multiply
+from freebandlib.transducer import (
+    Transducer,
+    _canonical_order,
+    _copy_transducer,
+    minimal_transducer,
+    transducer_canonical_encoding,
+    transducer_cont,
+    transducer_from_bytes,
+    transducer_minimize,
+    transducer_to_bytes,
+)
+from freebandlib.words import OutputLetter, OutputWord
+
+
+def _canonical_transducer(transducer: Transducer) -> Transducer:
+    # Return the transducer isomorphic to the trim transducer `transducer`,
+    # whose states are numbered as in transducer_canonical_encoding, so that
+    # isomorphic trim transducers become equal.
+    number, order = _canonical_order(transducer)
+    return Transducer._from_lists(
+        0,
+        [
+            [None if child is None else number[child] for child in children]
+            for children in map(transducer.next_state.__getitem__, order)
+        ],
+        [transducer.next_letter[state][:] for state in order],
+        [transducer.terminal[state] for state in order],
+    )
+
+
+def _element_from_bytes(data: bytes) -> FreeBandElement:
+    # Unpickle an element, see FreeBandElement.__reduce__.
+    return FreeBandElement._from_canonical(transducer_from_bytes(data))
+
+
+class FreeBandElement:
+    """An element of a free band.
+
+    Parameters
+    ----------
+    transducer: Transducer
+        A transducer representing the element.
+
+    Raises
+    ------
+    RuntimeError
+        If `transducer` does not represent any element, i.e. if its trim
+        transducer has no initial state.
+
+    Notes
+    -----
+    An element holds the minimal transducer representing it, whose states are
+    numbered in the order of :func:`transducer_canonical_encoding`, so that
+    equal elements hold equal transducers, and are compared in linear time.
+    The content, the canonical key, the short-lex least word and its length
+    are computed the first time they are used, and stored afterwards.
+
+    Elements are immutable, and are pickled as the encoding of their
+    transducer by :func:`transducer_to_bytes`.
+    """
+
+    __slots__ = (
+        "_transducer",
+        "_content",
+        "_key",
+        "_hash",
+        "_normal_form",
+        "_length",
+    )
+
+    def __init__(self, transducer: Transducer):
+        transducer = transducer_minimize(transducer)
+        if transducer.initial is None:
+            raise RuntimeError("the argument must represent an element")
+        self._set_transducer(_canonical_transducer(transducer))
+
+    def _set_transducer(self, transducer: Transducer) -> None:
+        self._transducer = transducer
+        self._content: Optional[FrozenSet[OutputLetter]] = None
+        self._key: Optional[Tuple[int, ...]] = None
+        self._hash: Optional[int] = None
+        self._normal_form: Optional[Tuple[OutputLetter, ...]] = None
+        self._length: Optional[int] = None
+
+    @classmethod
+    def _from_canonical(cls, transducer: Transducer) -> FreeBandElement:
+        # Return the element held by the minimal canonical transducer
+        # `transducer`, without minimizing it again.
+        element = cls.__new__(cls)
+        element._set_transducer(transducer)
+        return element
+
+    @classmethod
+    def from_word(cls, word: OutputWord) -> FreeBandElement:
+        """Return the element represented by a word.
+
+        Parameters
+        ----------
+        word: OutputWord
+            A word over the output alphabet.
+
+        Returns
+        -------
+        FreeBandElement
+            The element represented by `word`.
+        """
+        return cls._from_canonical(
+            _canonical_transducer(minimal_transducer(word))
+        )
+
+    @property
+    def transducer(self) -> Transducer:
+        """A copy of the minimal transducer representing the element."""
+        return _copy_transducer(self._transducer)
+
+    @property
+    def nr_states(self) -> int:
+        """The number of states of the minimal transducer of the element."""
+        return self._transducer.nr_states
+
+    @property
+    def content(self) -> FrozenSet[OutputLetter]:
+        """The content of the element."""
+        if self._content is None:
+            self._content = frozenset(transducer_cont(0, self._transducer))
+        return self._content
+
+    @property
+    def key(self) -> Tuple[int, ...]:
+        """The :func:`transducer_canonical_encoding` of the element."""
+        if self._key is None:
+            self._key = transducer_canonical_encoding(self._transducer)
+        return self._key
+
+    @property
+    def normal_form(self) -> OutputWord:
+        """The short-lex least word representing the element."""
+        if self._normal_form is None:
+            self._normal_form = tuple(min_word(self._transducer))
+            self._length = len(self._normal_form)
+        return list(self._normal_form)
+
+    @property
+    def length(self) -> int:
+        """The length of the short-lex least word representing the element."""
+        if self._length is None:
+            self._length = min_word_length(self._transducer)
+        return self._length
+
+    def __mul__(self, other: FreeBandElement) -> FreeBandElement:
+        """Return the product of two elements.
+
+        The product is computed by :func:`multiply`, and then minimized.
+        """
+        if not isinstance(other, FreeBandElement):
+            return NotImplemented
+        product = transducer_minimize(
+            multiply(self._transducer, other._transducer)
+        )
+        return FreeBandElement._from_canonical(_canonical_transducer(product))
+
+    def __eq__(self, other: object) -> bool:
+        """Check if two elements are equal."""
+        if not isinstance(other, FreeBandElement):
+            return NotImplemented
+        if self is other:
+            return True
+        if (
+            self._hash is not None
+            and other._hash is not None
+            and self._hash != other._hash
+        ):
+            return False
+        t, u = self._transducer, other._transducer
+        return (
+            t.next_letter == u.next_letter
+            and t.next_state == u.next_state
+            and t.terminal == u.terminal
+        )
+
+    def __hash__(self) -> int:
+        """Return the hash of the canonical key of the element."""
+        if self._hash is None:
+            self._hash = hash(self.key)
+        return self._hash
+
+    def __repr__(self) -> str:
+        """Generate a textual representation of the element."""
+        return f"FreeBandElement.from_word({self.normal_form!r})"
+
+    def __reduce__(self):
+        """Pickle the element as the encoding of its transducer."""
+        return (_element_from_bytes, (transducer_to_bytes(self._transducer),))
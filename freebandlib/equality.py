@@ -3,16 +3,122 @@
 See Section 4 of THEPAPER for more information.
 """
 
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import (
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from freebandlib.cache import cached
 from freebandlib.transducer import (
     OutputWord,
+    StateId,
     Transducer,
-    transducer_isomorphism,
-    transducer_minimize,
     minimal_transducer,
+    transducer_canonical_encoding,
+    transducer_cont,
+    transducer_minimize,
+)
+from freebandlib.words import (
+    OutputLetter,
+    _validate_output_word,
+    compute_left,
+    compute_right,
+    first_occurrence_order,
+    last_occurrence_order,
+)
+
+T = TypeVar("T")
+
+
+def _invariants_equal(word1: OutputWord, word2: OutputWord) -> bool:
+    # Check necessary conditions for two non-empty words to be equal in the
+    # free band, in order of increasing cost, stopping at the first that fails.
+    if word1[0] != word2[0] or word1[-1] != word2[-1]:
+        return False
+    # The images in the free left regular band, this also checks the contents.
+    first1 = first_occurrence_order(word1)
+    if first1 != first_occurrence_order(word2):
+        return False
+    # The images in the free right regular band.
+    last1 = last_occurrence_order(word1)
+    if last1 != last_occurrence_order(word2):
+        return False
+    # The words are equal if and only if their prefixes pref(w) and suffixes
+    # suff(w) are, and the letters ltof(w) and ftol(w), which were compared
+    # above, are. The first occurrence order of pref(w) is a prefix of that of
+    # w, so only its last occurrence order needs to be compared, and dually
+    # for suff(w).
+    pref1 = word1[: word1.index(first1[-1])]
+    pref2 = word2[: word2.index(first1[-1])]
+    if last_occurrence_order(pref1) != last_occurrence_order(pref2):
+        return False
+    suff1 = word1[len(word1) - word1[::-1].index(last1[0]) :]
+    suff2 = word2[len(word2) - word2[::-1].index(last1[0]) :]
+    return first_occurrence_order(suff1) == first_occurrence_order(suff2)
+
+
+def _lockstep_equal(word1: OutputWord, word2: OutputWord, k: int) -> bool:
+    # Check if two non-empty words with contents of size k are equal in the
+    # free band, by walking the interval transducers of the two words at the
+    # same time, without building them. The pairs of intervals (i1, j1) of
+    # word1 and (i2, j2) of word2 reached by the same input word are visited
+    # one level of content at a time, and the words are equal if and only if
+    # the transitions from every such pair output the same letters. The arrays
+    # compute_right and compute_left of each level are only computed once
+    # every pair on the level above has been checked.
+    level: Set[Tuple[int, int, int, int]] = {
+        (0, len(word1) - 1, 0, len(word2) - 1)
+    }
+    while k > 1:
+        k -= 1
+        right1, left1 = compute_right(k, word1), compute_left(k, word1)
+        right2, left2 = compute_right(k, word2), compute_left(k, word2)
+        next_level: Set[Tuple[int, int, int, int]] = set()
+        for i1, j1, i2, j2 in level:
+            r1, r2 = right1[i1], right2[i2]
+            l1, l2 = left1[j1], left2[j2]
+            assert r1 is not None and r2 is not None
+            assert l1 is not None and l2 is not None
+            if word1[r1 + 1] != word2[r2 + 1] or word1[l1 - 1] != word2[l2 - 1]:
+                return False
+            next_level.add((i1, r1, i2, r2))
+            next_level.add((l1, j1, l2, j2))
+        level = next_level
+    # Every interval with content of size 1 outputs its only letter and then
+    # reaches the terminal state.
+    return all(word1[i1] == word2[i2] for i1, _, i2, _ in level)
+
+
+@cached(
+    key=lambda word1, word2: (tuple(word1), tuple(word2)),
+    size=lambda result, word1, word2: len(word1) + len(word2),
 )
+def _equal_words(word1: OutputWord, word2: OutputWord) -> bool:
+    # The comparison of equal_in_free_band, without the fingerprints, so that
+    # the results that are cached only depend on the words.
+    if len(word1) == 0 or len(word2) == 0:
+        return len(word1) == len(word2)
+    if not _invariants_equal(word1, word2):
+        return False
+    return _lockstep_equal(word1, word2, len(set(word1)))
 
 
-def equal_in_free_band(word1: OutputWord, word2: OutputWord) -> bool:
+def equal_in_free_band(
+    word1: OutputWord,
+    word2: OutputWord,
+    fingerprint1: Optional[int] = None,
+    fingerprint2: Optional[int] = None,
+) -> bool:
     """Check if two words are equal in a free band.
 
     Parameters
@@ -21,6 +127,12 @@ def equal_in_free_band(word1: OutputWord, word2: OutputWord) -> bool:
         A word over the output alphabet.
     word2: OutputWord
         A word over the output alphabet.
+    fingerprint1: Optional[int], default=None
+        The :func:`transducer_fingerprint` of the minimal transducer of
+        `word1`, if known.
+    fingerprint2: Optional[int], default=None
+        The :func:`transducer_fingerprint` of the minimal transducer of
+        `word2`, if known.
 
     Returns
     -------
@@ -28,15 +140,88 @@ def equal_in_free_band(word1: OutputWord, word2: OutputWord) -> bool:
         `True` if `word1` and `word2` are equal in a free band
         and `False` otherwise.
 
+    Raises
+    ------
+    TypeError
+        If `word1` or `word2` is not a list.
+    RuntimeError
+        If both fingerprints are given, and one of them has 64 bits and the
+        other 128 bits.
+
     Notes
     -----
     The alphabet of the underlying free band is implicitly assumed to be the
     the union of the content of `word1` and `word2`. Implements the
     `EqualInFreeBand` algorithm of THEPAPER.
+
+    If both fingerprints are given, and they differ, then `False` is returned
+    immediately. If they are equal, then the words are still compared as
+    follows, since different elements can have the same fingerprint. The
+    number of bits of a fingerprint is deduced from its value: 64-bit
+    fingerprints are less than :math:`2 ^ {64}`, and 128-bit fingerprints
+    are not, except with negligible probability.
+
+    First, the words are compared using invariants that can be computed in
+    linear time, and `False` is returned as soon as one of them differs. In
+    order, these are the first and last letters, the images in the free left
+    and right regular bands (see :func:`first_occurrence_order` and
+    :func:`last_occurrence_order`), and the same images of the prefixes
+    :math:`\\textrm{pref}(w)` and suffixes :math:`\\textrm{suff}(w)` of the
+    words.
+
+    If these all agree, then rather than building and comparing the minimal
+    transducers of the words, the interval transducers of the two words are
+    traversed simultaneously, one level of content at a time, and `False` is
+    returned as soon as they output different letters on the same input.
+    Every pair of states reached is only visited once, and the intervals of a
+    level are only computed if the previous level agrees.
+
+    If the cache is enabled, see :func:`enable_cache`, then the result of
+    comparing the words is cached with key `(word1, word2)`. The fingerprints
+    are compared first, so they do not affect the cached results.
     """
-    return transducer_isomorphism(
-        minimal_transducer(word1), minimal_transducer(word2)
-    )
+    _validate_output_word(word1)
+    _validate_output_word(word2)
+    if fingerprint1 is not None and fingerprint2 is not None:
+        if (fingerprint1 >> 64 == 0) != (fingerprint2 >> 64 == 0):
+            raise RuntimeError(
+                "the fingerprints must have the same number of bits, found "
+                f"{fingerprint1} and {fingerprint2}"
+            )
+        if fingerprint1 != fingerprint2:
+            return False
+    return _equal_words(word1, word2)
+
+
+def _useful_states(transducer: Transducer) -> Set[StateId]:
+    # Return the connected states of an acyclic transducer, like
+    # transducer_connected_states, but only visiting the states reachable
+    # from the initial state, rather than every state.
+    useful: Set[StateId] = set()
+    if transducer.initial is None:
+        return useful
+    visited: Set[StateId] = set()
+    # Each state is pushed before and after its children, marked by the second
+    # entry being False and True respectively. Since the transducer is
+    # acyclic, the children of a state are finished when it is popped again.
+    stack: List[Tuple[StateId, bool]] = [(transducer.initial, False)]
+    while len(stack) > 0:
+        state, children_done = stack.pop()
+        children = transducer.next_state[state]
+        if children_done:
+            if transducer.terminal[state] or any(
+                child in useful for child in children
+            ):
+                useful.add(state)
+            continue
+        if state in visited:
+            continue
+        visited.add(state)
+        stack.append((state, True))
+        for child in children:
+            if child is not None and child not in visited:
+                stack.append((child, False))
+    return useful
 
 
 def equivalent_transducers(
@@ -62,7 +247,373 @@ def equivalent_transducers(
     The alphabet of the underlying free band is implicitly assumed to be the
     the union of the content of the elements represented by `transducer1` and
     `transducer2`.
+
+    The transducers need not be minimal or trim, and neither is minimized.
+    Instead, the algorithm of Hopcroft and Karp is used: starting from the
+    pair of initial states, pairs of states reached by the same input are
+    merged using a union-find data structure, and `False` is returned as soon
+    as two merged states differ in whether they are terminal, or in the
+    letters they output. Transitions to states from which no terminal state
+    can be reached are treated as undefined.
+    """
+    useful1 = _useful_states(transducer1)
+    useful2 = _useful_states(transducer2)
+    if transducer1.initial not in useful1 or transducer2.initial not in useful2:
+        return (transducer1.initial in useful1) == (
+            transducer2.initial in useful2
+        )
+
+    # The state q of transducer2 is the element offset + q of the union-find
+    # data structure.
+    offset = transducer1.nr_states
+    parent: List[int] = list(range(offset + transducer2.nr_states))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    assert transducer1.initial is not None and transducer2.initial is not None
+    parent[offset + transducer2.initial] = transducer1.initial
+    stack: List[Tuple[StateId, StateId]] = [
+        (transducer1.initial, transducer2.initial)
+    ]
+    while len(stack) > 0:
+        state1, state2 = stack.pop()
+        if transducer1.terminal[state1] != transducer2.terminal[state2]:
+            return False
+        for letter, child1 in enumerate(transducer1.next_state[state1]):
+            child2 = transducer2.next_state[state2][letter]
+            if child1 not in useful1:
+                child1 = None
+            if child2 not in useful2:
+                child2 = None
+            if child1 is None or child2 is None:
+                if child1 is not child2:
+                    return False
+                continue
+            if (
+                transducer1.next_letter[state1][letter]
+                != transducer2.next_letter[state2][letter]
+            ):
+                return False
+            root1, root2 = find(child1), find(offset + child2)
+            if root1 != root2:
+                parent[root2] = root1
+                stack.append((child1, child2))
+    return True
+
+
+def _word_key(word: OutputWord) -> Tuple[int, ...]:
+    # The key of the element represented by a word, see classify_words.
+    return transducer_canonical_encoding(minimal_transducer(word))
+
+
+def _transducer_key(transducer: Transducer) -> Tuple[int, ...]:
+    # The key of the element represented by a transducer.
+    return transducer_canonical_encoding(transducer_minimize(transducer))
+
+
+def _keys(
+    key: Callable[[T], Tuple[int, ...]],
+    items: Iterable[T],
+    processes: Optional[int],
+    chunk_size: int,
+) -> Iterator[Tuple[int, ...]]:
+    # Yield key(item) for every item, in order. If processes is given, the
+    # items are read chunk_size at a time, and the keys of each chunk are
+    # computed by that many worker processes.
+    if processes is None or processes <= 1:
+        yield from map(key, items)
+        return
+    iterator = iter(items)
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if len(chunk) == 0:
+                return
+            yield from executor.map(
+                key, chunk, chunksize=-(-len(chunk) // processes)
+            )
+
+
+def _validate_chunk_size(chunk_size: int) -> None:
+    if chunk_size < 1:
+        raise RuntimeError(f"expected a positive integer, found {chunk_size}")
+
+
+def _classify(keys: Iterable[Tuple[int, ...]]) -> Iterator[int]:
+    # Yield the class of each key, where classes are numbered in the order
+    # they first occur.
+    classes: Dict[Tuple[int, ...], int] = {}
+    for key in keys:
+        yield classes.setdefault(key, len(classes))
+
+
+def classify_words(
+    words: Iterable[OutputWord],
+    processes: Optional[int] = None,
+    chunk_size: int = 1024,
+) -> Iterator[int]:
+    """Partition words into the classes of equal elements of a free band.
+
+    Parameters
+    ----------
+    words: Iterable[OutputWord]
+        Words over the output alphabet.
+    processes: Optional[int], default=None
+        The number of worker processes to use. If `None` or at most `1`, the
+        words are processed in the current process.
+    chunk_size: int, default=1024
+        The number of words that are read at a time when `processes` is given.
+
+    Yields
+    ------
+    int
+        For each word, in order, the number of its class, so that two words
+        have the same number if and only if they are equal in the free band.
+        The classes are numbered :math:`0, 1, 2, \\ldots` in the order in which
+        they first occur.
+
+    Raises
+    ------
+    RuntimeError
+        If `chunk_size` is not positive.
+
+    See Also
+    --------
+    classify_transducers: For classifying transducers.
+    join_words: For finding the equal pairs of words in two collections.
+
+    Notes
+    -----
+    The minimal transducer of every word is computed once, and the words are
+    grouped by the :func:`transducer_canonical_encoding` of their minimal
+    transducers using a dictionary, rather than comparing pairs of words with
+    :func:`equal_in_free_band`. The words are consumed and the classes are
+    produced lazily, so only the encodings of the distinct classes, and with
+    `processes` at most `chunk_size` words, are kept in memory.
+    """
+    _validate_chunk_size(chunk_size)
+    return _classify(_keys(_word_key, words, processes, chunk_size))
+
+
+def classify_transducers(
+    transducers: Iterable[Transducer],
+    processes: Optional[int] = None,
+    chunk_size: int = 1024,
+) -> Iterator[int]:
+    """Partition transducers into the classes of equal elements of a free band.
+
+    Parameters
+    ----------
+    transducers: Iterable[Transducer]
+        Transducers.
+    processes: Optional[int], default=None
+        The number of worker processes to use. If `None` or at most `1`, the
+        transducers are processed in the current process.
+    chunk_size: int, default=1024
+        The number of transducers that are read at a time when `processes` is
+        given.
+
+    Yields
+    ------
+    int
+        For each transducer, in order, the number of its class, so that two
+        transducers have the same number if and only if they represent the
+        same element. The classes are numbered :math:`0, 1, 2, \\ldots` in the
+        order in which they first occur.
+
+    Raises
+    ------
+    RuntimeError
+        If `chunk_size` is not positive.
+
+    See Also
+    --------
+    classify_words: For classifying words.
+
+    Notes
+    -----
+    Every transducer is minimized once, and the transducers are grouped by the
+    :func:`transducer_canonical_encoding` of their minimizations.
+    """
+    _validate_chunk_size(chunk_size)
+    return _classify(_keys(_transducer_key, transducers, processes, chunk_size))
+
+
+def join_words(
+    words1: Iterable[OutputWord],
+    words2: Iterable[OutputWord],
+    processes: Optional[int] = None,
+    chunk_size: int = 1024,
+) -> Iterator[Tuple[int, int]]:
+    """Find the pairs of equal words in two collections of words.
+
+    Parameters
+    ----------
+    words1: Iterable[OutputWord]
+        Words over the output alphabet.
+    words2: Iterable[OutputWord]
+        Words over the output alphabet.
+    processes: Optional[int], default=None
+        The number of worker processes to use. If `None` or at most `1`, the
+        words are processed in the current process.
+    chunk_size: int, default=1024
+        The number of words that are read at a time when `processes` is given.
+
+    Yields
+    ------
+    Tuple[int, int]
+        The pairs `(i, j)` such that the `i`-th word of `words1` and the `j`-th
+        word of `words2` are equal in the free band, ordered by `j` and then
+        `i`.
+
+    Raises
+    ------
+    RuntimeError
+        If `chunk_size` is not positive.
+
+    See Also
+    --------
+    classify_words: For partitioning a single collection of words.
+
+    Notes
+    -----
+    This is a hash join: the words in `words1` are grouped by the key used in
+    :func:`classify_words` when this function is called, and then the key of
+    every word in `words2` is looked up in the groups. Only the groups are
+    kept in memory, and `words2` is consumed lazily.
+    """
+    _validate_chunk_size(chunk_size)
+    groups: Dict[Tuple[int, ...], List[int]] = {}
+    for i, key in enumerate(_keys(_word_key, words1, processes, chunk_size)):
+        groups.setdefault(key, []).append(i)
+    return _probe(groups, _keys(_word_key, words2, processes, chunk_size))
+
+
+def _probe(
+    groups: Dict[Tuple[int, ...], List[int]],
+    keys: Iterable[Tuple[int, ...]],
+) -> Iterator[Tuple[int, int]]:
+    # Yield the pairs (i, j) such that i is in the group of the j-th key.
+    for j, key in enumerate(keys):
+        for i in groups.get(key, ()):
+            yield i, j
+
+
+class EqualityIndex:
+    """An index of elements of a free band for finding equal elements.
+
+    Parameters
+    ----------
+    transducers: Iterable[Transducer]
+        Transducers representing the reference elements, which are numbered
+        :math:`0, 1, 2, \\ldots` in order (default: no references).
+
+    Notes
+    -----
+    Every reference is minimized once, when it is added. The references are
+    grouped by their content, then by the number of states of their minimal
+    transducers, and finally by the :func:`transducer_canonical_encoding` of
+    their minimal transducers in a dictionary. A query is answered by
+    computing the same data for the query element and looking it up, so the
+    expected time does not depend on the number of references. Queries for
+    words whose content does not occur among the references are answered
+    without computing the minimal transducer of the word.
     """
-    return transducer_isomorphism(
-        transducer_minimize(transducer1), transducer_minimize(transducer2)
-    )
+
+    def __init__(self, transducers: Iterable[Transducer] = ()):
+        self._nr_references = 0
+        self._buckets: Dict[
+            FrozenSet[OutputLetter],
+            Dict[int, Dict[Tuple[int, ...], List[int]]],
+        ] = {}
+        for transducer in transducers:
+            self.add(transducer)
+
+    def __len__(self) -> int:
+        """Return the number of references in the index."""
+        return self._nr_references
+
+    @staticmethod
+    def _content(transducer: Transducer) -> FrozenSet[OutputLetter]:
+        if transducer.initial is None:
+            return frozenset()
+        return frozenset(transducer_cont(transducer.initial, transducer))
+
+    def add(self, transducer: Transducer) -> int:
+        """Add a reference to the index.
+
+        Parameters
+        ----------
+        transducer: Transducer
+            A transducer representing the reference.
+
+        Returns
+        -------
+        int
+            The number of the new reference.
+        """
+        transducer = transducer_minimize(transducer)
+        by_nr_states = self._buckets.setdefault(self._content(transducer), {})
+        by_encoding = by_nr_states.setdefault(transducer.nr_states, {})
+        key = transducer_canonical_encoding(transducer)
+        by_encoding.setdefault(key, []).append(self._nr_references)
+        self._nr_references += 1
+        return self._nr_references - 1
+
+    def _find_minimal(
+        self, transducer: Transducer, content: FrozenSet[OutputLetter]
+    ) -> List[int]:
+        by_nr_states = self._buckets.get(content)
+        if by_nr_states is None:
+            return []
+        by_encoding = by_nr_states.get(transducer.nr_states)
+        if by_encoding is None:
+            return []
+        key = transducer_canonical_encoding(transducer)
+        return list(by_encoding.get(key, ()))
+
+    def find(self, transducer: Transducer) -> List[int]:
+        """Find the references equal to the element of a transducer.
+
+        Parameters
+        ----------
+        transducer: Transducer
+            A transducer.
+
+        Returns
+        -------
+        List[int]
+            The numbers of the references representing the same element as
+            `transducer`, in increasing order.
+        """
+        transducer = transducer_minimize(transducer)
+        return self._find_minimal(transducer, self._content(transducer))
+
+    def find_word(self, word: OutputWord) -> List[int]:
+        """Find the references equal to a word in the free band.
+
+        Parameters
+        ----------
+        word: OutputWord
+            A word over the output alphabet.
+
+        Returns
+        -------
+        List[int]
+            The numbers of the references representing the same element as
+            `word`, in increasing order.
+
+        Raises
+        ------
+        TypeError
+            If `word` is not a list.
+        """
+        _validate_output_word(word)
+        content = frozenset(word)
+        if content not in self._buckets:
+            return []
+        return self._find_minimal(minimal_transducer(word), content)
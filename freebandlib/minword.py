@@ -4,11 +4,36 @@ See Section 6 of THEPAPER for more information.
 """
 # pylint: disable=invalid-name
 
+from collections import OrderedDict
 from enum import Enum
-from typing import Tuple, List
+from functools import cmp_to_key
+from itertools import islice
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
-from freebandlib.transducer import StateId, Transducer, transducer_cont
-from freebandlib.words import OutputWord
+from freebandlib.cache import cached
+from freebandlib.slp import Rule, StraightLineProgram
+from freebandlib.transducer import (
+    StateId,
+    Transducer,
+    minimal_transducer,
+    transducer_cont,
+    transducer_topological_order,
+)
+from freebandlib.words import (
+    OutputLetter,
+    OutputWord,
+    word_from_bytes,
+    word_to_bytes,
+)
 
 
 class Case(Enum):
@@ -37,9 +62,14 @@ def classify_case(t: Transducer, q: StateId) -> Tuple[Case, int]:
 
     Notes
     -----
-    Implements the `ClassifyCase` algorithm of THEPAPER.
+    Implements the `ClassifyCase` algorithm of THEPAPER. If `t` has a spine
+    index, see :func:`transducer_index_spines`, then the size of the content
+    of `q` is read from it rather than computed by walking along the 0-spine.
     """
-    N = len(transducer_cont(q, t))
+    if t.spine_index is not None:
+        N = t.spine_index.depth[0][q]
+    else:
+        N = len(transducer_cont(q, t))
     if t.next_letter[q][0] == t.next_letter[q][1]:
         return (Case.I, N)
     u, v = t.next_state[q][0], t.next_state[q][1]
@@ -56,6 +86,74 @@ def classify_case(t: Transducer, q: StateId) -> Tuple[Case, int]:
     assert False
 
 
+def classify_cases(
+    t: Transducer,
+) -> Tuple[List[Optional[Case]], List[int], List[Optional[StateId]]]:
+    """Return the case of Lemma 5.3 for every state of a transducer.
+
+    Parameters
+    ----------
+    t: Transducer
+        A minimal transducer representing :math:`x\\in\\textrm{FB}(A)`.
+
+    Returns
+    -------
+    List[Optional[Case]]
+        The case of Lemma 5.3 that applies to each state, or `None` for
+        terminal states.
+    List[int]
+        The relevant value of :math:`k` for each state, or `0` for terminal
+        states.
+    List[Optional[StateId]]
+        For each state :math:`q` in Case II, the state reached from the 0-child
+        of :math:`q` by reading :math:`1^k`, whose word is the overlap of the
+        words of the children of :math:`q`, and `None` for all other states.
+
+    See Also
+    --------
+    classify_case: For classifying a single state.
+
+    Notes
+    -----
+    The states are processed in reverse topological order, so that the size of
+    the content of each state can be computed from that of its 0-child, rather
+    than by walking along the 0-spine as in :func:`classify_case`. The walk
+    determining the case is stopped as soon as the case is known, and the
+    state it stops at is recorded for Case II.
+    """
+    topo_order = transducer_topological_order(t)
+    assert topo_order is not None
+    size_cont: List[int] = [0] * t.nr_states
+    cases: List[Optional[Case]] = [None] * t.nr_states
+    ks: List[int] = [0] * t.nr_states
+    targets: List[Optional[StateId]] = [None] * t.nr_states
+    for q in reversed(topo_order):
+        if t.terminal[q]:
+            continue
+        u, v = t.next_state[q][0], t.next_state[q][1]
+        letter0, letter1 = t.next_letter[q][0], t.next_letter[q][1]
+        N = 1 + size_cont[u]
+        size_cont[q] = N
+        if letter0 == letter1:
+            cases[q], ks[q] = Case.I, N
+            continue
+        for k in range(N):
+            if (
+                t.next_letter[u][1] == letter1
+                and t.next_letter[v][0] == letter0
+                and t.next_state[u][1] == t.next_state[v][0]
+            ):
+                cases[q], ks[q] = Case.II, k + 1
+                targets[q] = t.next_state[u][1]
+                break
+            u, v = t.next_state[u][1], t.next_state[v][0]
+            if t.terminal[u] or t.terminal[v]:
+                cases[q], ks[q] = Case.III, N
+                break
+        assert cases[q] is not None
+    return cases, ks, targets
+
+
 def min_word(t: Transducer) -> OutputWord:
     """Compute the short-lex least word representing the same element as `t`.
 
@@ -72,49 +170,865 @@ def min_word(t: Transducer) -> OutputWord:
     Notes
     -----
     Implements a version of the `MinWord` algorithm of THEPAPER.
+
+    The recursion of `MinWord` is simulated using an explicit stack, and the
+    output is appended to a single list. Whenever the word of a state has
+    already been computed, it is copied from the earlier part of the output
+    using the table `B`, so the running time is linear in the length of the
+    output. The cases of all states are computed beforehand using
+    :func:`classify_cases`.
     """
-    # TODO: Move this outside the wrapped function?
-    def min_word_recurse(
-        t: Transducer,
-        q: StateId,
-        w: OutputWord,
-        l: int,
-        B: List[List[Tuple[int, int]]],
-    ) -> OutputWord:
+    cases, _, targets = classify_cases(t)
+    return _min_word(t, t.initial, cases, targets, None, None)
+
+
+def _min_word(
+    t: Transducer,
+    initial: StateId,
+    cases: List[Optional[Case]],
+    targets: List[Optional[StateId]],
+    lengths: Optional[List[int]],
+    memo: Optional["_WordMemo"],
+) -> OutputWord:
+    # The body of min_word, computing the word of the state initial. If memo
+    # is not None, then the words of states are also looked up in and added to
+    # memo, and lengths contains the lengths of the words of the states.
+
+    # B[q] = (i, j) records that the word of the state q is w[i - 1 : j]. A
+    # dictionary is used, since only the states visited are stored.
+    B: Dict[StateId, Tuple[int, int]] = {}
+    w: OutputWord = []
+    # Each stack frame is (q, l, s, stage), where l is the length of the
+    # prefix of the word of q that has already been written to w, s is the
+    # position in w where the word of q starts, and stage is one of:
+    # 0 - the state q has not been visited yet;
+    # 1 - the word of the 0-child of q has been written;
+    # 2 - the word of the 1-child of q has been written.
+    stack: List[Tuple[StateId, int, int, int]] = [(initial, 0, 0, 0)]
+    while len(stack) > 0:
+        q, l, s, stage = stack.pop()
         assert q is not None
-        s = len(w) - l + 1
-        if B[q] is not None:
-            i, j = B[q]
-            if i == 0 or j == 0:
-                return w, B
-            return w + w[i + l - 1 : j], B
-        w, B = min_word_recurse(t, t.next_state[q][0], w, l, B)
-        c, k = classify_case(t, q)
+        if stage == 0:
+            if t.terminal[q]:
+                continue
+            if q in B:
+                i, j = B[q]
+                w.extend(w[i + l - 1 : j])
+                continue
+            s = len(w) - l + 1
+            if memo is not None:
+                assert lengths is not None
+                if lengths[q] == l:
+                    # The whole word of q is the overlap that was already
+                    # written, its B entry may be missing if the overlap was
+                    # copied from the memo.
+                    B[q] = (s, len(w))
+                    continue
+                location = memo.get(q)
+                if location is not None:
+                    u, i, j = location
+                    w.extend(u[i + l : j])
+                    B[q] = (s, len(w))
+                    continue
+            stack.append((q, l, s, 1))
+            stack.append((t.next_state[q][0], l, 0, 0))
+        elif stage == 1:
+            c = cases[q]
+            if c is Case.I:
+                w.append(t.next_letter[q][0])
+                l = 0
+            elif c is Case.II:
+                r = targets[q]
+                assert r is not None
+                if t.terminal[r]:
+                    l = 0
+                elif r not in B:
+                    # The word of r was copied from the memo as part of the
+                    # word of one of its ancestors.
+                    assert lengths is not None
+                    l = lengths[r]
+                else:
+                    i, j = B[r]
+                    l = j - i + 1
+            else:
+                w.append(t.next_letter[q][0])
+                w.append(t.next_letter[q][1])
+                l = 0
+            stack.append((q, l, s, 2))
+            stack.append((t.next_state[q][1], l, 0, 0))
+        else:
+            B[q] = (s, len(w))
+            if memo is not None:
+                memo.add(q, w, s - 1, len(w))
+    return w
+
+
+class _WordMemo:
+    # A least recently used cache with at most max_size entries, mapping the
+    # states in shared to the location (w, i, j) of their words w[i:j] in the
+    # output of an earlier transducer. The outputs are kept anyway, so storing
+    # locations rather than copies costs no letters.
+
+    def __init__(self, shared: Set[StateId], max_size: int):
+        self.shared = shared
+        self.max_size = max_size
+        self.words: OrderedDict[StateId, Tuple[OutputWord, int, int]] = (
+            OrderedDict()
+        )
+
+    def get(self, key: StateId) -> Optional[Tuple[OutputWord, int, int]]:
+        location = self.words.get(key)
+        if location is not None:
+            self.words.move_to_end(key)
+        return location
+
+    def add(self, key: StateId, w: OutputWord, i: int, j: int) -> None:
+        if key not in self.shared or key in self.words or self.max_size == 0:
+            return
+        self.words[key] = (w, i, j)
+        if len(self.words) > self.max_size:
+            self.words.popitem(last=False)
+
+
+def _add_to_union(
+    t: Transducer,
+    union: Transducer,
+    table: Dict[Tuple[StateId, StateId, OutputLetter, OutputLetter], StateId],
+) -> List[StateId]:
+    # Add the states of t to union, whose only terminal state is 0, merging
+    # every state with any state of union inducing an isomorphic subtransducer,
+    # and so representing the same element, as in minimal_transducer. Returns
+    # the state of union corresponding to each state of t.
+    topo_order = transducer_topological_order(t)
+    assert topo_order is not None
+    states: List[StateId] = [0] * t.nr_states
+    for q in reversed(topo_order):
+        if t.terminal[q]:
+            continue
+        key = (
+            states[t.next_state[q][0]],
+            states[t.next_state[q][1]],
+            t.next_letter[q][0],
+            t.next_letter[q][1],
+        )
+        state = table.get(key)
+        if state is None:
+            state = union.add_state([key[0], key[1]], [key[2], key[3]], False)
+            table[key] = state
+        states[q] = state
+    return states
+
+
+def min_words(
+    transducers: Iterable[Transducer], max_memo_size: int = 1 << 16
+) -> List[OutputWord]:
+    """Compute the short-lex least words representing many elements.
+
+    Parameters
+    ----------
+    transducers: Iterable[Transducer]
+        Minimal transducers.
+    max_memo_size: int
+        The maximum number of words stored in the memo shared between the
+        transducers (default: :math:`2^{16}`).
+
+    Returns
+    -------
+    List[OutputWord]
+        The short-lex least word equivalent to the element represented by
+        each transducer, in order.
+
+    Raises
+    ------
+    RuntimeError
+        If `max_memo_size` is negative.
+
+    See Also
+    --------
+    min_word: For computing the word of a single transducer.
+
+    Notes
+    -----
+    The transducers are first merged into a single transducer with one
+    initial state per element, in which any two states inducing isomorphic
+    subtransducers, and so representing the same element, are identified. The
+    cases of Lemma 5.3 are then computed once for the merged transducer,
+    rather than once for each element.
+
+    The word of every state shared by at least two of the transducers is
+    recorded in a memo when first computed, and copied from it when the same
+    state is reached from a later initial state, rather than being computed
+    again. The memo only records where each word occurs in the output, and
+    when it holds more than `max_memo_size` words, the least recently used
+    word is discarded.
+    """
+    if max_memo_size < 0:
+        raise RuntimeError(
+            f"expected a non-negative integer, found {max_memo_size}"
+        )
+    union = Transducer(None, [[None, None]], [[None, None]], [True])
+    table: Dict[
+        Tuple[StateId, StateId, OutputLetter, OutputLetter], StateId
+    ] = {}
+    seen: Set[StateId] = set()
+    shared: Set[StateId] = set()
+    initials: List[StateId] = []
+    for t in transducers:
+        states = _add_to_union(t, union, table)
+        assert t.initial is not None
+        initials.append(states[t.initial])
+        distinct = set(states)
+        shared |= distinct & seen
+        seen |= distinct
+    del table, seen
+    cases, _, targets = classify_cases(union)
+    lengths = _min_word_lengths(union, cases, targets)
+    memo = _WordMemo(shared, max_memo_size)
+    return [
+        _min_word(union, q, cases, targets, lengths, memo) for q in initials
+    ]
+
+
+def _min_word_lengths(
+    t: Transducer,
+    cases: List[Optional[Case]],
+    targets: List[Optional[StateId]],
+) -> List[int]:
+    # Return the length of the short-lex least word of every state of t.
+    topo_order = transducer_topological_order(t)
+    assert topo_order is not None
+    lengths: List[int] = [0] * t.nr_states
+    for q in reversed(topo_order):
+        c = cases[q]
+        if c is None:
+            continue
+        length = lengths[t.next_state[q][0]] + lengths[t.next_state[q][1]]
         if c is Case.I:
-            w.append(t.next_letter[q][0])
-            l = 0
+            length += 1
         elif c is Case.II:
-            # TODO better way of doing this?
-            r: StateId = t.next_state[q][0]
-            for _ in range(k):
-                r = t.next_state[r][1]
-            assert r is not None
-            assert B[r] is not None
-            i, j = B[r]
-            if i == 0 or j == 0 or j < i:
-                l = 0
+            length -= lengths[targets[q]]
+        else:
+            length += 2
+        lengths[q] = length
+    return lengths
+
+
+def min_word_length(t: Transducer) -> int:
+    """Compute the length of the short-lex least word representing `t`.
+
+    Parameters
+    ----------
+    t: Transducer
+        The minimal transducer representing :math:`x\\in\\textrm{FB}(A)`.
+
+    Returns
+    -------
+    int
+        The length of the short-lex least word equivalent to :math:`x`.
+
+    Notes
+    -----
+    The word of a state :math:`q` consists of the word of its 0-child, the
+    letters written in Case I or III, and the word of its 1-child, where in
+    Case II the overlap with the word of the 0-child is omitted. Hence the
+    lengths of the words of all states can be computed bottom-up without
+    computing the word.
+    """
+    cases, _, targets = classify_cases(t)
+    if t.initial is None:
+        return 0
+    return _min_word_lengths(t, cases, targets)[t.initial]
+
+
+def min_word_letter_counts(t: Transducer) -> List[int]:
+    """Count the occurrences of letters in the short-lex least word of `t`.
+
+    Parameters
+    ----------
+    t: Transducer
+        The minimal transducer representing :math:`x\\in\\textrm{FB}(A)`.
+
+    Returns
+    -------
+    List[int]
+        A list whose :math:`a`-th entry is the number of occurrences of
+        the letter :math:`a` in the short-lex least word equivalent to
+        :math:`x`. The list has one entry for each letter up to the largest
+        letter output by `t`.
+
+    See Also
+    --------
+    min_word_length: For computing the length of the short-lex least word.
+
+    Notes
+    -----
+    This uses the same recursion as :func:`min_word_length`, but with a list
+    of letter counts for every state, which takes :math:`O(|Q||A|)` time.
+    """
+    cases, _, targets = classify_cases(t)
+    nr_letters = 1 + max(
+        (
+            letter
+            for next_letter in t.next_letter
+            for letter in next_letter
+            if letter is not None
+        ),
+        default=-1,
+    )
+    topo_order = transducer_topological_order(t)
+    assert topo_order is not None
+    counts: List[Optional[List[int]]] = [None] * t.nr_states
+    for q in reversed(topo_order):
+        c = cases[q]
+        if c is None:
+            counts[q] = [0] * nr_letters
+            continue
+        counts_q = [
+            x + y
+            for x, y in zip(
+                counts[t.next_state[q][0]], counts[t.next_state[q][1]]
+            )
+        ]
+        if c is Case.I:
+            counts_q[t.next_letter[q][0]] += 1
+        elif c is Case.II:
+            for letter, x in enumerate(counts[targets[q]]):
+                counts_q[letter] -= x
+        else:
+            counts_q[t.next_letter[q][0]] += 1
+            counts_q[t.next_letter[q][1]] += 1
+        counts[q] = counts_q
+    if t.initial is None:
+        return [0] * nr_letters
+    return counts[t.initial]
+
+
+def _iter_min_word(
+    t: Transducer,
+    cases: List[Optional[Case]],
+    targets: List[Optional[StateId]],
+    lengths: List[int],
+    start: int = 0,
+) -> Iterator[OutputLetter]:
+    # Yield the letters of the short-lex least word of t from position start
+    # onwards. The stack contains pairs (q, l) standing for the word of the
+    # state q without its first l letters, and pairs (None, a) standing for
+    # the letter a. The next `skip` letters are not output.
+    skip = start
+    stack: List[Tuple[Optional[StateId], int]] = [(t.initial, 0)]
+    while len(stack) > 0:
+        q, x = stack.pop()
+        if q is None:
+            if skip > 0:
+                skip -= 1
+            else:
+                yield x
+            continue
+        skip += x
+        if skip >= lengths[q]:
+            skip -= lengths[q]
+            continue
+        c = cases[q]
+        if c is Case.II:
+            stack.append((t.next_state[q][1], lengths[targets[q]]))
+        else:
+            stack.append((t.next_state[q][1], 0))
+            if c is Case.III:
+                stack.append((None, t.next_letter[q][1]))
+            stack.append((None, t.next_letter[q][0]))
+        stack.append((t.next_state[q][0], 0))
+
+
+def iter_min_word(t: Transducer) -> Iterator[OutputLetter]:
+    """Iterate over the short-lex least word representing the same element.
+
+    Parameters
+    ----------
+    t: Transducer
+        The minimal transducer representing :math:`x\\in\\textrm{FB}(A)`.
+
+    Yields
+    ------
+    OutputLetter
+        The letters of the short-lex least word equivalent to :math:`x`, in
+        order.
+
+    See Also
+    --------
+    min_word: For computing the whole word at once.
+
+    Notes
+    -----
+    Rather than copying earlier parts of the output as :func:`min_word` does,
+    the word of a state is generated again by walking the transducer each time
+    it is required. The letters of the overlaps in Case II are skipped using
+    the lengths of the words of the states, which are computed beforehand.
+    Hence only :math:`O(|Q|)` memory is used in addition to the transducer,
+    independently of the length of the output.
+    """
+    cases, _, targets = classify_cases(t)
+    lengths = _min_word_lengths(t, cases, targets)
+    return _iter_min_word(t, cases, targets, lengths)
+
+
+def min_word_slp(t: Transducer) -> StraightLineProgram:
+    """Compute a straight-line program for the short-lex least word of `t`.
+
+    Parameters
+    ----------
+    t: Transducer
+        The minimal transducer representing :math:`x\\in\\textrm{FB}(A)`.
+
+    Returns
+    -------
+    StraightLineProgram
+        A straight-line program generating the short-lex least word
+        equivalent to :math:`x`.
+
+    See Also
+    --------
+    min_word: For computing the word itself.
+
+    Notes
+    -----
+    The program has a rule generating the word of each state :math:`q`, given
+    by the word of the 0-child of :math:`q`, the letters written in Case I or
+    III, and the word of the 1-child of :math:`q` without the overlap in Case
+    II. The latter is not necessarily the word of a state, and so further
+    rules are added for the suffixes of the words of states that are required.
+    Each such suffix requires at most one new rule per state on a path in the
+    transducer, so the program has :math:`O(|Q||A|)` rules, even though the
+    word can have length exponential in :math:`|A|`.
+    """
+    cases, _, targets = classify_cases(t)
+    lengths = _min_word_lengths(t, cases, targets)
+
+    # The key (q, l) stands for the word of the state q without its first l
+    # letters, rule_of maps such keys to the index of the rule generating this
+    # word, or to None for the empty word.
+    rules: List[Rule] = []
+    rule_of: Dict[Tuple[StateId, int], Optional[int]] = {}
+
+    def decompose(key: Tuple[StateId, int]) -> Tuple[
+        Optional[Tuple[StateId, int]],
+        Tuple[OutputLetter, ...],
+        Optional[Tuple[StateId, int]],
+    ]:
+        # Write the word of key as the word of a key, followed by some
+        # letters, followed by the word of another key.
+        q, l = key
+        c = cases[q]
+        q0, q1 = t.next_state[q]
+        if c is Case.I:
+            middle: Tuple[OutputLetter, ...] = (t.next_letter[q][0],)
+        elif c is Case.II:
+            middle = ()
+        else:
+            middle = (t.next_letter[q][0], t.next_letter[q][1])
+        right_key = (q1, lengths[targets[q]] if c is Case.II else 0)
+        if l < lengths[q0]:
+            return ((q0, l), middle, right_key)
+        l -= lengths[q0]
+        if l < len(middle):
+            return (None, middle[l:], right_key)
+        l -= len(middle)
+        return (None, (), (right_key[0], right_key[1] + l))
+
+    # The rules are created in post-order, so that every rule only refers to
+    # earlier rules.
+    stack: List[Tuple[StateId, int]] = [(t.initial, 0)]
+    while len(stack) > 0:
+        key = stack[-1]
+        if key in rule_of:
+            stack.pop()
+            continue
+        q, l = key
+        if l >= lengths[q]:
+            rule_of[key] = None
+            stack.pop()
+            continue
+        left_key, middle, right_key = decompose(key)
+        missing = [
+            child_key
+            for child_key in (left_key, right_key)
+            if child_key is not None and child_key not in rule_of
+        ]
+        if len(missing) > 0:
+            stack.extend(missing)
+            continue
+        stack.pop()
+        left = rule_of[left_key] if left_key is not None else None
+        right = rule_of[right_key] if right_key is not None else None
+        if left is None and len(middle) == 0:
+            # The word of key is the word of right_key, no new rule required.
+            rule_of[key] = right
+        else:
+            rule_of[key] = len(rules)
+            rules.append((left, middle, right))
+    return StraightLineProgram(rules, rule_of[(t.initial, 0)])
+
+
+class MinWordIndex:
+    """Random access into the short-lex least word representing `t`.
+
+    Parameters
+    ----------
+    t: Transducer
+        The minimal transducer representing :math:`x\\in\\textrm{FB}(A)`.
+
+    Notes
+    -----
+    The index stores the case of Lemma 5.3 and the length of the word of every
+    state of `t`. The letter at a given position is then found by descending
+    from the initial state into the child whose word contains that position,
+    which takes time proportional to the depth of `t`, that is
+    :math:`O(|A|)`, without computing the word.
+
+    Slices are computed by streaming the word from the start of the slice as
+    in :func:`iter_min_word`, so they take :math:`O(|A|)` time plus time
+    linear in the length of the slice.
+    """
+
+    def __init__(self, t: Transducer):
+        self.transducer = t
+        self.cases, _, self.targets = classify_cases(t)
+        self.lengths = _min_word_lengths(t, self.cases, self.targets)
+
+    def __len__(self) -> int:
+        """Return the length of the short-lex least word."""
+        if self.transducer.initial is None:
+            return 0
+        return self.lengths[self.transducer.initial]
+
+    def __iter__(self) -> Iterator[OutputLetter]:
+        """Iterate over the short-lex least word, see :func:`iter_min_word`."""
+        return _iter_min_word(
+            self.transducer, self.cases, self.targets, self.lengths
+        )
+
+    def letter(self, position: int) -> OutputLetter:
+        """Return the letter at a position of the short-lex least word.
+
+        Parameters
+        ----------
+        position: int
+            A position in the range :math:`[0, n)`, where :math:`n` is the
+            length of the short-lex least word.
+
+        Returns
+        -------
+        OutputLetter
+            The letter at position `position`.
+
+        Raises
+        ------
+        IndexError
+            If `position` is out of range.
+        """
+        if not 0 <= position < len(self):
+            raise IndexError("position out of range")
+        t = self.transducer
+        q: StateId = t.initial
+        while True:
+            q0, q1 = t.next_state[q]
+            if position < self.lengths[q0]:
+                q = q0
+                continue
+            position -= self.lengths[q0]
+            c = self.cases[q]
+            if c is Case.I:
+                if position == 0:
+                    return t.next_letter[q][0]
+                position -= 1
+            elif c is Case.II:
+                position += self.lengths[self.targets[q]]
             else:
-                l = j - i + 1
+                if position < 2:
+                    return t.next_letter[q][position]
+                position -= 2
+            q = q1
+
+    def __getitem__(
+        self, key: Union[int, slice]
+    ) -> Union[OutputLetter, OutputWord]:
+        """Return a letter or a slice of the short-lex least word."""
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step < 0:
+                return [self.letter(i) for i in range(start, stop, step)]
+            if stop <= start:
+                return []
+            return list(
+                islice(
+                    _iter_min_word(
+                        self.transducer,
+                        self.cases,
+                        self.targets,
+                        self.lengths,
+                        start,
+                    ),
+                    0,
+                    stop - start,
+                    step,
+                )
+            )
+        if key < 0:
+            key += len(self)
+        return self.letter(key)
+
+
+def _expand(
+    index: MinWordIndex,
+    stack: List[Tuple[Optional[StateId], int]],
+    q: StateId,
+) -> None:
+    # Replace the word of the state q on the top of the stack by the word of
+    # its 0-child, the letters written in Case I or III and the word of its
+    # 1-child, in the format used by _iter_min_word.
+    t = index.transducer
+    c = index.cases[q]
+    stack.pop()
+    if c is Case.II:
+        stack.append((t.next_state[q][1], index.lengths[index.targets[q]]))
+    else:
+        stack.append((t.next_state[q][1], 0))
+        if c is Case.III:
+            stack.append((None, t.next_letter[q][1]))
+        stack.append((None, t.next_letter[q][0]))
+    stack.append((t.next_state[q][0], 0))
+
+
+def _normalize(
+    index: MinWordIndex, stack: List[Tuple[Optional[StateId], int]]
+) -> None:
+    # Expand the top of the stack until it is either a letter or the whole word
+    # of a state, dropping the letters of overlaps and empty words.
+    skip = 0
+    while len(stack) > 0:
+        q, x = stack[-1]
+        if q is None:
+            if skip == 0:
+                return
+            stack.pop()
+            skip -= 1
+            continue
+        skip += x
+        if skip == 0 and index.lengths[q] > 0:
+            return
+        if skip >= index.lengths[q]:
+            stack.pop()
+            skip -= index.lengths[q]
+            continue
+        stack[-1] = (q, 0)
+        _expand(index, stack, q)
+    assert skip == 0
+
+
+def _states_equal(
+    index1: MinWordIndex,
+    q1: StateId,
+    index2: MinWordIndex,
+    q2: StateId,
+    memo: Dict[Tuple[StateId, StateId], bool],
+) -> bool:
+    # Check if the states q1 and q2 of two minimal transducers represent the
+    # same element, i.e. if the subtransducers they generate are isomorphic.
+    if (q1, q2) in memo:
+        return memo[(q1, q2)]
+    t1, t2 = index1.transducer, index2.transducer
+    seen = {(q1, q2)}
+    que = [(q1, q2)]
+    while len(que) > 0:
+        r1, r2 = que.pop()
+        if memo.get((r1, r2)) is True:
+            continue
+        if (
+            memo.get((r1, r2)) is False
+            or t1.terminal[r1] != t2.terminal[r2]
+            or index1.lengths[r1] != index2.lengths[r2]
+            or t1.next_letter[r1] != t2.next_letter[r2]
+        ):
+            memo[(q1, q2)] = False
+            return False
+        for child1, child2 in zip(t1.next_state[r1], t2.next_state[r2]):
+            if child1 is not None and (child1, child2) not in seen:
+                seen.add((child1, child2))
+                que.append((child1, child2))
+    for pair in seen:
+        memo[pair] = True
+    return True
+
+
+def _compare_indexes(index1: MinWordIndex, index2: MinWordIndex) -> int:
+    # Compare the short-lex least words of two minimal transducers lazily.
+    if len(index1) != len(index2):
+        return -1 if len(index1) < len(index2) else 1
+    t1, t2 = index1.transducer, index2.transducer
+    memo: Dict[Tuple[StateId, StateId], bool] = {}
+    stack1: List[Tuple[Optional[StateId], int]] = [(t1.initial, 0)]
+    stack2: List[Tuple[Optional[StateId], int]] = [(t2.initial, 0)]
+    while True:
+        _normalize(index1, stack1)
+        _normalize(index2, stack2)
+        if len(stack1) == 0 or len(stack2) == 0:
+            # Both words have the same length, so both stacks are empty.
+            return 0
+        (q1, x1), (q2, x2) = stack1[-1], stack2[-1]
+        if q1 is None and q2 is None:
+            if x1 != x2:
+                return -1 if x1 < x2 else 1
+            stack1.pop()
+            stack2.pop()
+        elif q1 is not None and q2 is not None:
+            length1, length2 = index1.lengths[q1], index2.lengths[q2]
+            if length1 == length2 and _states_equal(
+                index1, q1, index2, q2, memo
+            ):
+                # The words of equal elements are equal, skip them.
+                stack1.pop()
+                stack2.pop()
+                continue
+            if length1 >= length2:
+                _expand(index1, stack1, q1)
+            if length2 >= length1:
+                _expand(index2, stack2, q2)
+        elif q1 is not None:
+            _expand(index1, stack1, q1)
         else:
-            w.append(t.next_letter[q][0])
-            w.append(t.next_letter[q][1])
-            l = 0
-        w, B = min_word_recurse(t, t.next_state[q][1], w, l, B)
-        B[q] = (s, len(w))
-        return w, B
-
-    B = [None] * t.nr_states
-    for i, sid in enumerate(t.terminal):
-        if sid:
-            B[i] = (0, 1)
-    return min_word_recurse(t, t.initial, [], 0, B)[0]
+            _expand(index2, stack2, q2)
+
+
+def compare_min_words(t1: Transducer, t2: Transducer) -> int:
+    """Compare the short-lex least words of two minimal transducers.
+
+    Parameters
+    ----------
+    t1: Transducer
+        The minimal transducer representing :math:`x\\in\\textrm{FB}(A)`.
+    t2: Transducer
+        The minimal transducer representing :math:`y\\in\\textrm{FB}(A)`.
+
+    Returns
+    -------
+    int
+        `-1`, `0` or `1` if the short-lex least word representing :math:`x` is
+        respectively less than, equal to or greater than that of :math:`y` in
+        the short-lex order.
+
+    See Also
+    --------
+    sort_elements: For sorting many transducers.
+
+    Notes
+    -----
+    The lengths of the words are compared first, using the lengths of the
+    words of the states. If they agree, then the words are generated in
+    lockstep from the transducers as in :func:`iter_min_word`, until the first
+    position where they differ. Whenever both words continue with the whole
+    word of a state, and these states represent the same element, which is
+    checked by a memoised search for an isomorphism, then the common word is
+    skipped without being generated.
+    """
+    return _compare_indexes(MinWordIndex(t1), MinWordIndex(t2))
+
+
+def sort_elements(
+    transducers: Iterable[Transducer], unique: bool = False
+) -> List[Transducer]:
+    """Sort minimal transducers by their short-lex least words.
+
+    Parameters
+    ----------
+    transducers: Iterable[Transducer]
+        Minimal transducers.
+    unique: bool, default=False
+        If `True`, only the first of the transducers representing the same
+        element is kept.
+
+    Returns
+    -------
+    List[Transducer]
+        The transducers sorted by the short-lex order on the short-lex least
+        words they represent.
+
+    See Also
+    --------
+    compare_min_words: For the comparison that is used.
+
+    Notes
+    -----
+    The data required to compare the transducers, see :class:`MinWordIndex`,
+    is computed once for each transducer, and the sort is stable.
+    """
+    indexes = sorted(
+        (MinWordIndex(t) for t in transducers),
+        key=cmp_to_key(_compare_indexes),
+    )
+    if unique:
+        indexes = [
+            index
+            for i, index in enumerate(indexes)
+            if i == 0 or _compare_indexes(indexes[i - 1], index) != 0
+        ]
+    return [index.transducer for index in indexes]
+
+
+@cached(
+    key=lambda word: tuple(word),
+    size=lambda result, word: len(word) + len(result),
+    copy=list,
+    encode=word_to_bytes,
+    decode=word_from_bytes,
+)
+def normal_form(word: OutputWord) -> OutputWord:
+    """Compute the short-lex least word equal to `word` in the free band.
+
+    Parameters
+    ----------
+    word: OutputWord
+        A word.
+
+    Returns
+    -------
+    OutputWord
+        The short-lex least word representing the same element of the free
+        band as `word`.
+
+    See Also
+    --------
+    normal_forms: For computing the normal forms of many words.
+
+    Notes
+    -----
+    This is `min_word(minimal_transducer(word))`, where
+    :func:`minimal_transducer` builds the minimal transducer directly from the
+    intervals of `word`, one level at a time, without building the interval
+    transducer first.
+
+    If the cache is enabled, see :func:`enable_cache`, or the persistent
+    cache is enabled, see :func:`enable_disk_cache`, then the result is cached
+    with key `word`.
+    """
+    return min_word(minimal_transducer(word))
+
+
+def normal_forms(words: Iterable[OutputWord]) -> Iterator[OutputWord]:
+    """Compute the short-lex least words equal to some words in the free band.
+
+    Parameters
+    ----------
+    words: Iterable[OutputWord]
+        Words.
+
+    Yields
+    ------
+    OutputWord
+        The normal form, see :func:`normal_form`, of each word, in order.
+
+    Notes
+    -----
+    The words are processed one at a time, so only the transducer of the
+    current word is held in memory.
+    """
+    for word in words:
+        yield normal_form(word)
@@ -3,19 +3,80 @@
 See Section 5 of THEPAPER for more information.
 """
 
-from typing import List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
 from freebandlib.words import OutputLetter
+from freebandlib.cache import cached
 from freebandlib.transducer import (
     StateId,
     Transducer,
+    _copy_transducer,
+    _freeze_transducer,
+    _thaw_transducer,
+    transducer_connected_states,
+    transducer_isomorphism,
+    transducer_minimize,
     transducer_precompute_q,
-    transducer_cont,
 )
 
 
+class MultiplicationProfile:
+    """The data about a transducer used by :func:`multiply`.
+
+    Parameters
+    ----------
+    transducer: Transducer
+        A transducer representing :math:`x\\in\\textrm{FB}(A)`.
+
+    Attributes
+    ----------
+    spine0: List[StateId]
+        The states reachable from the initial state by reading `0`, see
+        :func:`transducer_precompute_q`.
+    spine1: List[StateId]
+        The states reachable from the initial state by reading `1`.
+    letters0: List[Optional[OutputLetter]]
+        The output letters along `spine0`, so that `letters0[i]` is the letter
+        output when reading `0` in the state `spine0[i]`.
+    letters1: List[Optional[OutputLetter]]
+        The output letters along `spine1`.
+    content: Set[OutputLetter]
+        The content of :math:`x`.
+
+    Notes
+    -----
+    The profile only depends on the spines of the transducer, so it has to be
+    recomputed if the transducer is modified. When the same transducer is
+    multiplied many times, its profile can be computed once and passed to
+    :func:`multiply` and :func:`compute_k`.
+    """
+
+    def __init__(self, transducer: Transducer):
+        self.spine0: List[StateId] = transducer_precompute_q(
+            transducer.initial, 0, transducer
+        )
+        self.spine1: List[StateId] = transducer_precompute_q(
+            transducer.initial, 1, transducer
+        )
+        self.letters0: List[Optional[OutputLetter]] = [
+            transducer.next_letter[state][0] for state in self.spine0
+        ]
+        self.letters1: List[Optional[OutputLetter]] = [
+            transducer.next_letter[state][1] for state in self.spine1
+        ]
+        self.content: Set[OutputLetter] = set(
+            letter for letter in self.letters0 if letter is not None
+        )
+
+
 def compute_k(
-    alpha: int, transducer_x: Transducer, transducer_y: Transducer
+    alpha: int,
+    transducer_x: Transducer,
+    transducer_y: Transducer,
+    profile_x: Optional[MultiplicationProfile] = None,
+    profile_y: Optional[MultiplicationProfile] = None,
 ) -> List[List[Optional[int]]]:
     r"""Given a transducer return the K function.
 
@@ -27,6 +88,10 @@ def compute_k(
         A transducer representing :math:`x\in\FB(A)`.
     transducer_y : Transducer
         A transducer representing :math:`y\in\FB(A)`.
+    profile_x: Optional[MultiplicationProfile], default=None
+        The multiplication profile of `transducer_x`, computed if not given.
+    profile_y: Optional[MultiplicationProfile], default=None
+        The multiplication profile of `transducer_y`, computed if not given.
 
     Returns
     -------
@@ -38,50 +103,126 @@ def compute_k(
     -----
     Implements the `ComputeK` algorithm of THEPAPER.
     """
-    q_x = transducer_precompute_q(transducer_x.initial, 1, transducer_x)
-    q_y = transducer_precompute_q(transducer_y.initial, 0, transducer_y)
-    cont_x = transducer_cont(transducer_x.initial, transducer_x)
-    cont_y = transducer_cont(transducer_y.initial, transducer_y)
+    if profile_x is None:
+        profile_x = MultiplicationProfile(transducer_x)
+    if profile_y is None:
+        profile_y = MultiplicationProfile(transducer_y)
+    letters_x = profile_x.letters1
+    letters_y = profile_y.letters0
+    size_cont_x = len(profile_x.content)
+    size_cont_y = len(profile_y.content)
     K: List[List[Optional[int]]] = [
-        [None for j in range(len(cont_y) + 1)] for i in range(len(cont_x) + 1)
+        [None for j in range(size_cont_y + 1)] for i in range(size_cont_x + 1)
     ]
     c = set()
+    # Once every letter of the content of y (resp. x) has been added to `c`,
+    # all of the remaining entries of K are undefined, so we can stop early.
+    # This always happens if cont(y) is a subset of cont(x) (resp. the other
+    # way around).
+    nr_covered = 0
     if alpha == 0:
-        for i in range(len(cont_x), -1, -1):
-            for j in range(len(cont_y), -1, -1):
-                letter = transducer_y.next_letter[q_y[j]][0]
+        for i in range(size_cont_x, -1, -1):
+            for j in range(size_cont_y, -1, -1):
+                letter = letters_y[j]
                 if letter is not None and letter not in c:
                     K[i][j] = 1
                 elif (
                     letter is not None
-                    and j + 1 <= len(cont_y)
+                    and j + 1 <= size_cont_y
                     and K[i][j + 1] is not None
                 ):
                     K[i][j] = 1 + K[i][j + 1]
             if i != 0:
-                letter = transducer_x.next_letter[q_x[i - 1]][1]
+                letter = letters_x[i - 1]
+                if letter not in c and letter in profile_y.content:
+                    nr_covered += 1
                 c.add(letter)
+                if nr_covered == size_cont_y:
+                    break
         return K
     # TODO: Remove code duplication
     # alpha == 1
-    for j in range(len(cont_y), -1, -1):
-        for i in range(len(cont_x), -1, -1):
-            letter = transducer_x.next_letter[q_x[i]][1]
+    for j in range(size_cont_y, -1, -1):
+        for i in range(size_cont_x, -1, -1):
+            letter = letters_x[i]
             if letter is not None and letter not in c:
                 K[i][j] = 1
             elif (
                 letter is not None
-                and i + 1 <= len(cont_x)
+                and i + 1 <= size_cont_x
                 and K[i + 1][j] is not None
             ):
                 K[i][j] = 1 + K[i + 1][j]
         if j != 0:
-            letter = transducer_y.next_letter[q_y[j - 1]][0]
+            letter = letters_y[j - 1]
+            if letter not in c and letter in profile_x.content:
+                nr_covered += 1
             c.add(letter)
+            if nr_covered == size_cont_x:
+                break
     return K
 
 
-def multiply(transducer_x: Transducer, transducer_y: Transducer) -> Transducer:
+def _is_trim(transducer: Transducer) -> bool:
+    return len(transducer_connected_states(transducer)) == transducer.nr_states
+
+
+def _multiply_trivial(
+    transducer_x: Transducer,
+    transducer_y: Transducer,
+    profile_x: MultiplicationProfile,
+    profile_y: MultiplicationProfile,
+) -> Optional[Transducer]:
+    # Check if the product xy is trivially equal to x or y, and if so return
+    # a copy of the corresponding transducer, otherwise return None. Since
+    # bands are idempotent, xx = x, and the empty word is an identity.
+    if len(profile_y.content) == 0:
+        return _copy_transducer(transducer_x)
+    if len(profile_x.content) == 0 or transducer_x is transducer_y:
+        return _copy_transducer(transducer_y)
+    # The spines of equal elements output the same letters, so these cheap
+    # checks reject most unequal pairs before checking for isomorphism.
+    if (
+        transducer_x.nr_states == transducer_y.nr_states
+        and profile_x.letters0 == profile_y.letters0
+        and profile_x.letters1 == profile_y.letters1
+        and _is_trim(transducer_x)
+        and _is_trim(transducer_y)
+        and transducer_isomorphism(transducer_x, transducer_y)
+    ):
+        return _copy_transducer(transducer_x)
+    return None
+
+
+def _cache_key(transducer: Transducer) -> Tuple:
+    # The initial state, transitions and terminal states of transducer, which
+    # determine it. Every state has two transitions, so the transitions are
+    # flattened into a single tuple, which is quicker to build and to hash.
+    return (
+        transducer.initial,
+        tuple(chain.from_iterable(transducer.next_state)),
+        tuple(chain.from_iterable(transducer.next_letter)),
+        tuple(transducer.terminal),
+    )
+
+
+@cached(
+    key=lambda transducer_x, transducer_y, *_, **__: (
+        _cache_key(transducer_x),
+        _cache_key(transducer_y),
+    ),
+    size=lambda product, transducer_x, transducer_y, *_, **__: (
+        product.nr_states + transducer_x.nr_states + transducer_y.nr_states
+    ),
+    copy=_thaw_transducer,
+    store=_freeze_transducer,
+)
+def multiply(
+    transducer_x: Transducer,
+    transducer_y: Transducer,
+    profile_x: Optional[MultiplicationProfile] = None,
+    profile_y: Optional[MultiplicationProfile] = None,
+) -> Transducer:
     """Compute the product transducer.
 
     Parameters
@@ -90,6 +231,10 @@ def multiply(transducer_x: Transducer, transducer_y: Transducer) -> Transducer:
         A transducer.
     transducer_y: Transducer
         A transducer.
+    profile_x: Optional[MultiplicationProfile], default=None
+        The multiplication profile of `transducer_x`, computed if not given.
+    profile_y: Optional[MultiplicationProfile], default=None
+        The multiplication profile of `transducer_y`, computed if not given.
 
     Returns
     -------
@@ -99,103 +244,367 @@ def multiply(transducer_x: Transducer, transducer_y: Transducer) -> Transducer:
     Notes
     -----
     Implements the `Multiply` algorithm of THEPAPER.
+
+    If one of the transducers represents the empty word, or both transducers
+    represent the same element (which is detected if they are the same object
+    or are isomorphic), then a copy of one of the inputs is returned instead.
+
+    If the cache is enabled, see :func:`enable_cache`, then the result is
+    cached with key the initial states, transitions and terminal states of
+    the two transducers, which are read on every call. So the result is
+    only found in the cache if the transducers are equal, state by state, to
+    transducers that were multiplied before, and the transducers can be
+    modified in any way between calls.
     """
-    product_transducer = Transducer(None, [], [], [])
-    # Copy each of the existing transducers
-    inclusion_x: List[Optional[StateId]] = [
-        None for state in range(transducer_x.nr_states)
-    ]
-    inclusion_y: List[Optional[StateId]] = [
-        None for state in range(transducer_y.nr_states)
-    ]
-    for transducer, inclusion in [
-        (transducer_x, inclusion_x),
-        (transducer_y, inclusion_y),
-    ]:
-        for state in range(transducer.nr_states):
-            inclusion[state] = product_transducer.add_state(
-                [None, None], [None, None], transducer.terminal[state]
-            )
-
-    for transducer, inclusion in [
-        (transducer_x, inclusion_x),
-        (transducer_y, inclusion_y),
-    ]:
-        for state in range(transducer.nr_states):
-            product_state = inclusion[state]
-            assert product_state is not None
-            for letter in [0, 1]:
-                product_transducer.next_letter[product_state][
-                    letter
-                ] = transducer.next_letter[state][letter]
-                child = transducer.next_state[state][letter]
-                if child is not None:
-                    assert inclusion[child] is not None
-                    product_transducer.next_state[product_state][
-                        letter
-                    ] = inclusion[child]
-
-    assert inclusion_x[transducer_x.initial] is not None
-    assert inclusion_y[transducer_y.initial] is not None
-    q_x = transducer_precompute_q(
-        inclusion_x[transducer_x.initial], 1, product_transducer
-    )
-    q_y = transducer_precompute_q(
-        inclusion_y[transducer_y.initial], 0, product_transducer
+    if profile_x is None:
+        profile_x = MultiplicationProfile(transducer_x)
+    if profile_y is None:
+        profile_y = MultiplicationProfile(transducer_y)
+
+    trivial_product = _multiply_trivial(
+        transducer_x, transducer_y, profile_x, profile_y
     )
-    cont_x = transducer_cont(transducer_x.initial, transducer_x)
-    cont_y = transducer_cont(transducer_y.initial, transducer_y)
-    K0 = compute_k(0, transducer_x, transducer_y)
-    K1 = compute_k(1, transducer_x, transducer_y)
+    if trivial_product is not None:
+        return trivial_product
 
-    state_lookup: List[List[Optional[StateId]]] = [
-        [None for j in range(len(cont_y) + 1)] for i in range(len(cont_x) + 1)
+    # The lists of the product are built directly, rather than by add_state,
+    # since every row belongs to the product. First, the states of each of
+    # the transducers are copied, the states of transducer_x keep their ids,
+    # and the states of transducer_y are added after them.
+    nr_states_x = transducer_x.nr_states
+    next_states: List[List[Optional[StateId]]] = [
+        row[::] for row in transducer_x.next_state
     ]
-    reverse_state_lookup: List[Optional[Tuple[int, int]]] = [
-        None for state in range(product_transducer.nr_states)
+    next_states.extend(
+        [None if child is None else child + nr_states_x for child in row]
+        for row in transducer_y.next_state
+    )
+    next_letters: List[List[Optional[OutputLetter]]] = [
+        row[::] for row in transducer_x.next_letter
+    ]
+    next_letters.extend(row[::] for row in transducer_y.next_letter)
+    terminal = transducer_x.terminal + transducer_y.terminal
+
+    q_x = profile_x.spine1
+    q_y = [state + nr_states_x for state in profile_y.spine0]
+    letters_x = profile_x.letters1
+    letters_y = profile_y.letters0
+    size_x = len(profile_x.content)
+    size_y = len(profile_y.content)
+    K0 = compute_k(0, transducer_x, transducer_y, profile_x, profile_y)
+    K1 = compute_k(1, transducer_x, transducer_y, profile_x, profile_y)
+
+    # The state (i, j) with j = size_y (resp. i = size_x) is equivalent to
+    # q_x[i] (resp. q_y[j]), so the transitions into it are replaced by
+    # transitions into q_x[i] (resp. q_y[j]).
+    state_lookup: List[List[StateId]] = [
+        [0] * (size_y + 1) for _ in range(size_x + 1)
     ]
-    for i in range(len(cont_x), -1, -1):
-        for j in range(len(cont_y), -1, -1):
-            next_state: List[Optional[StateId]] = [None, None]
-            next_letter: List[Optional[OutputLetter]] = [None, None]
-            if K0[i][j] is not None:
-                next_state[0] = state_lookup[i][j + K0[i][j]]
-                next_letter[0] = product_transducer.next_letter[
-                    q_y[j + K0[i][j] - 1]
-                ][0]
+    initial: Optional[StateId] = None
+    for i in range(size_x, -1, -1):
+        for j in range(size_y, -1, -1):
+            k0, k1 = K0[i][j], K1[i][j]
+            child0: Optional[StateId]
+            child1: Optional[StateId]
+            letter0: Optional[OutputLetter] = None
+            letter1: Optional[OutputLetter] = None
+            if k0 is not None:
+                child0 = state_lookup[i][j + k0]
+                letter0 = letters_y[j + k0 - 1]
             else:
-                if (
-                    q_x[i] is not None
-                    and product_transducer.next_state[q_x[i]][0] is not None
-                ):
-                    next_state[0] = product_transducer.next_state[q_x[i]][0]
-                    next_letter[0] = product_transducer.next_letter[q_x[i]][0]
-            if K1[i][j] is not None:
-                next_state[1] = state_lookup[i + K1[i][j]][j]
-                next_letter[1] = product_transducer.next_letter[
-                    q_x[i + K1[i][j] - 1]
-                ][1]
+                child0 = next_states[q_x[i]][0]
+                if child0 is not None:
+                    letter0 = next_letters[q_x[i]][0]
+            if k1 is not None:
+                child1 = state_lookup[i + k1][j]
+                letter1 = letters_x[i + k1 - 1]
             else:
-                if (
-                    q_y[j] is not None
-                    and product_transducer.next_state[q_y[j]][1] is not None
-                ):
-                    next_state[1] = product_transducer.next_state[q_y[j]][1]
-                    next_letter[1] = product_transducer.next_letter[q_y[j]][1]
-            state_lookup[i][j] = product_transducer.add_state(
-                next_state, next_letter, False
-            )
-            reverse_state_lookup.append((i, j))
-
-    product_transducer.initial = state_lookup[0][0]
-    for state in range(product_transducer.nr_states):
-        for letter in [0, 1]:
-            child = product_transducer.next_state[state][letter]
-            if child is not None and reverse_state_lookup[child] is not None:
-                i, j = reverse_state_lookup[child]
-                if j == len(cont_y):
-                    product_transducer.next_state[state][letter] = q_x[i]
-                elif i == len(cont_x):
-                    product_transducer.next_state[state][letter] = q_y[j]
+                child1 = next_states[q_y[j]][1]
+                if child1 is not None:
+                    letter1 = next_letters[q_y[j]][1]
+            initial = len(next_states)
+            next_states.append([child0, child1])
+            next_letters.append([letter0, letter1])
+            terminal.append(False)
+            if j == size_y:
+                state_lookup[i][j] = q_x[i]
+            elif i == size_x:
+                state_lookup[i][j] = q_y[j]
+            else:
+                state_lookup[i][j] = initial
 
+    return Transducer._from_lists(initial, next_states, next_letters, terminal)
+
+
+def _multiply_letter(
+    transducer: Transducer,
+    letter: OutputLetter,
+    spine: List[StateId],
+    letters: List[Optional[OutputLetter]],
+    position: Optional[int],
+    alpha: int,
+) -> Transducer:
+    # Multiply x by the letter a on the right if alpha == 0 and on the left if
+    # alpha == 1. Here `spine` and `letters` are the (1 - alpha)-spine of x and
+    # the letters along it, and `position` is the index of a in `letters`.
+    #
+    # This is Multiply specialised to the case where one of the transducers
+    # represents a single letter. Then only the states (i, 0) of the product
+    # grid are required, and since the letters along a spine are distinct, the
+    # K functions are determined by `position`:
+    # * K_alpha(i, 0) = 1 if a does not occur in letters[i:], and is undefined
+    #   otherwise;
+    # * K_beta(i, 0) = 1 if letters[i] != a, it is 2 if letters[i] == a and
+    #   i + 1 < N, and it is undefined otherwise.
+    beta = 1 - alpha
+    N = len(spine) - 1
+    product_transducer = transducer.copy()
+    terminal = spine[N]
+    letter_state = product_transducer.add_state(
+        [terminal, terminal], [letter, letter], False
+    )
+    first = product_transducer.nr_states
+    for i in range(N):
+        next_state: List[Optional[StateId]] = [None, None]
+        next_letter: List[Optional[OutputLetter]] = [None, None]
+        if position is None or i > position:
+            next_state[alpha] = spine[i]
+            next_letter[alpha] = letter
+        else:
+            next_state[alpha] = transducer.next_state[spine[i]][alpha]
+            next_letter[alpha] = transducer.next_letter[spine[i]][alpha]
+        if letters[i] != letter:
+            k: Optional[int] = 1
+        elif i + 1 < N:
+            k = 2
+        else:
+            k = None
+        if k is None:
+            next_state[beta] = terminal
+            next_letter[beta] = letter
+        else:
+            next_state[beta] = first + i + k if i + k < N else letter_state
+            next_letter[beta] = letters[i + k - 1]
+        product_transducer.add_state(next_state, next_letter, False)
+    product_transducer.initial = first if N > 0 else letter_state
     return product_transducer
+
+
+def _side_to_alpha(side: str) -> int:
+    if side == "right":
+        return 0
+    if side == "left":
+        return 1
+    raise RuntimeError(f'side must be "left" or "right", not {side!r}')
+
+
+def multiply_letter(
+    transducer: Transducer, letter: OutputLetter, side: str = "right"
+) -> Transducer:
+    """Compute the product of an element and a single letter.
+
+    Parameters
+    ----------
+    transducer: Transducer
+        A transducer representing :math:`x\\in\\textrm{FB}(A)`.
+    letter: OutputLetter
+        A letter :math:`a`.
+    side: str, default="right"
+        Either `"right"` to compute :math:`xa` or `"left"` to compute
+        :math:`ax`.
+
+    Returns
+    -------
+    Transducer
+        A transducer representing :math:`xa` or :math:`ax`.
+
+    Raises
+    ------
+    RuntimeError
+        If `side` is not `"left"` or `"right"`.
+
+    See Also
+    --------
+    multiply_generators: For multiplying by every letter of the alphabet.
+
+    Notes
+    -----
+    This is a specialisation of :func:`multiply`, which only reads the
+    1-spine (resp. 0-spine) of `transducer` and adds one state for each letter
+    in the content of :math:`x` to a copy of `transducer`.
+
+    The copy is made by :meth:`Transducer.copy`, so the states of the
+    product that are states of `transducer` share their transitions with
+    `transducer`. Hence the transitions of either transducer must only be
+    modified by :meth:`Transducer.set_transition` afterwards, which copies
+    the transitions of a state before modifying them.
+    """
+    alpha = _side_to_alpha(side)
+    profile = MultiplicationProfile(transducer)
+    spine, letters = (
+        (profile.spine1, profile.letters1)
+        if alpha == 0
+        else (profile.spine0, profile.letters0)
+    )
+    position = letters.index(letter) if letter in profile.content else None
+    return _multiply_letter(transducer, letter, spine, letters, position, alpha)
+
+
+def multiply_generators(
+    transducer: Transducer,
+    side: str = "right",
+    alphabet_size: Optional[int] = None,
+) -> List[Transducer]:
+    """Compute the products of an element with every letter of the alphabet.
+
+    Parameters
+    ----------
+    transducer: Transducer
+        A transducer representing :math:`x\\in\\textrm{FB}(A)`.
+    side: str, default="right"
+        Either `"right"` to compute the products :math:`xa` or `"left"` to
+        compute the products :math:`ax`.
+    alphabet_size: Optional[int], default=None
+        The size of the alphabet :math:`A = \\{0, 1, \\ldots, n - 1\\}`.
+        If `None`, this is the least alphabet containing the content of
+        :math:`x`.
+
+    Returns
+    -------
+    List[Transducer]
+        A list whose :math:`a`-th entry is a transducer representing :math:`xa`
+        or :math:`ax`, depending on `side`.
+
+    Raises
+    ------
+    RuntimeError
+        If `side` is not `"left"` or `"right"`.
+
+    See Also
+    --------
+    multiply_letter: For multiplying by a single letter.
+
+    Notes
+    -----
+    Each product shares the transitions of the states of `transducer`, as in
+    :func:`multiply_letter`.
+    """
+    alpha = _side_to_alpha(side)
+    profile = MultiplicationProfile(transducer)
+    spine, letters = (
+        (profile.spine1, profile.letters1)
+        if alpha == 0
+        else (profile.spine0, profile.letters0)
+    )
+    if alphabet_size is None:
+        alphabet_size = max(profile.content, default=-1) + 1
+    position: Dict[OutputLetter, int] = {
+        letter: i for i, letter in enumerate(letters[:-1])
+    }
+    return [
+        _multiply_letter(
+            transducer, letter, spine, letters, position.get(letter), alpha
+        )
+        for letter in range(alphabet_size)
+    ]
+
+
+def _multiply_many_serial(transducers: Sequence[Transducer]) -> Transducer:
+    # Reduce the non-empty sequence `transducers` level by level, multiplying
+    # adjacent pairs, so that every intermediate product has roughly the same
+    # number of factors.
+    level: List[Transducer] = list(transducers)
+    if len(level) == 1:
+        return transducer_minimize(level[0])
+    while len(level) > 1:
+        next_level: List[Transducer] = [
+            transducer_minimize(multiply(level[i], level[i + 1]))
+            for i in range(0, len(level) - 1, 2)
+        ]
+        if len(level) % 2 == 1:
+            next_level.append(level[-1])
+        level = next_level
+    return level[0]
+
+
+def multiply_many(
+    transducers: Sequence[Transducer], processes: Optional[int] = None
+) -> Transducer:
+    r"""Compute the minimal transducer of the product of a sequence.
+
+    Parameters
+    ----------
+    transducers: Sequence[Transducer]
+        A sequence of transducers representing :math:`x_1, \ldots, x_n`.
+    processes: Optional[int], default=None
+        The number of worker processes to use. If `None` or at most `1`, the
+        product is computed in the current process.
+
+    Returns
+    -------
+    Transducer
+        The minimal transducer representing :math:`x_1 \cdots x_n`. If the
+        sequence is empty, then this is the transducer of the empty word.
+
+    See Also
+    --------
+    multiply_scan: For computing all prefix products.
+
+    Notes
+    -----
+    The product is computed by a balanced binary tree of calls to
+    :func:`multiply`, and every intermediate product is minimized. Hence each
+    transducer is involved in :math:`O(\log n)` products, rather than the
+    :math:`O(n)` products of a left fold, in which the accumulated product is
+    copied in every step.
+
+    If `processes` is given, the sequence is split into that many contiguous
+    blocks, the product of each block is computed in a separate process, and
+    the products of the blocks are then multiplied in the current process.
+    """
+    if len(transducers) == 0:
+        return Transducer(0, [[None, None]], [[None, None]], [True])
+    if processes is None or processes <= 1 or len(transducers) < 2 * processes:
+        return _multiply_many_serial(transducers)
+
+    block_size = -(-len(transducers) // processes)
+    blocks = [
+        transducers[i : i + block_size]
+        for i in range(0, len(transducers), block_size)
+    ]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        products = list(executor.map(_multiply_many_serial, blocks))
+    return _multiply_many_serial(products)
+
+
+def multiply_scan(transducers: Iterable[Transducer]) -> List[Transducer]:
+    r"""Compute the minimal transducers of all prefix products of a sequence.
+
+    Parameters
+    ----------
+    transducers: Iterable[Transducer]
+        Transducers representing :math:`x_1, \ldots, x_n`.
+
+    Returns
+    -------
+    List[Transducer]
+        A list whose :math:`i`-th entry is the minimal transducer representing
+        :math:`x_1 \cdots x_{i + 1}`.
+
+    See Also
+    --------
+    multiply_many: For computing only the product of the whole sequence.
+
+    Notes
+    -----
+    Every prefix product is minimized before it is multiplied by the next
+    transducer, so the accumulated product never has more states than the
+    minimal transducer of the element it represents.
+    """
+    result: List[Transducer] = []
+    for transducer in transducers:
+        if len(result) == 0:
+            result.append(transducer_minimize(transducer))
+        else:
+            result.append(transducer_minimize(multiply(result[-1], transducer)))
+    return result
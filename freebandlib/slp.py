@@ -0,0 +1,149 @@
+"""Straight-line programs representing words.
+
+A straight-line program is a context-free grammar that generates exactly one
+word. They allow highly repetitive words, such as the short-lex least words
+representing elements of a free band, to be stored in space that can be
+exponentially smaller than the length of the word.
+"""
+
+from typing import Iterator, List, Optional, Tuple, Union
+
+from freebandlib.words import OutputLetter, OutputWord
+
+# A rule (left, middle, right) generates the word generated by the rule
+# `left`, followed by the letters of `middle`, followed by the word generated by
+# the rule `right`, where a `None` rule generates the empty word.
+Rule = Tuple[Optional[int], Tuple[OutputLetter, ...], Optional[int]]
+
+# The modulus and base of the polynomial hash, the modulus is a Mersenne prime.
+_HASH_MODULUS = (1 << 61) - 1
+_HASH_BASE = 1000003
+
+
+class StraightLineProgram:
+    """A datastructure representing a word by a straight-line program.
+
+    Parameters
+    ----------
+    rules: List[Rule]
+        The rules of the program. Each rule is a triple `(left, middle,
+        right)` where `left` and `right` are either `None` or the index of a
+        rule occurring earlier in the list, and `middle` is a tuple of letters.
+    start: Optional[int]
+        The index of the rule generating the word, or `None` for the empty
+        word.
+
+    Attributes
+    ----------
+    lengths: List[int]
+        The lengths of the words generated by the rules.
+
+    Raises
+    ------
+    RuntimeError
+        If a rule refers to a rule that does not occur before it, or if
+        `start` is not the index of a rule.
+
+    Notes
+    -----
+    The word generated by the rule `(left, middle, right)` is the word
+    generated by `left`, followed by the letters in `middle`, followed by the
+    word generated by `right`. Requiring rules to only refer to earlier rules
+    guarantees that every rule generates exactly one word.
+    """
+
+    def __init__(self, rules: List[Rule], start: Optional[int]):
+        self.rules = rules
+        self.start = start
+        self.lengths: List[int] = []
+        for index, (left, middle, right) in enumerate(rules):
+            for child in (left, right):
+                if child is not None and not 0 <= child < index:
+                    raise RuntimeError(
+                        f"rule {index} must only refer to earlier rules"
+                    )
+            self.lengths.append(
+                self._length(left) + len(middle) + self._length(right)
+            )
+        if start is not None and not 0 <= start < len(rules):
+            raise RuntimeError(
+                f"start must be None or in the range [0, {len(rules)})"
+            )
+
+    def _length(self, rule: Optional[int]) -> int:
+        return 0 if rule is None else self.lengths[rule]
+
+    @property
+    def nr_rules(self) -> int:
+        """The number of rules of the program."""
+        return len(self.rules)
+
+    @property
+    def length(self) -> int:
+        """The length of the word generated by the program."""
+        return self._length(self.start)
+
+    def __repr__(self):
+        """Generate a textual representation of the program."""
+        return repr((self.start, self.rules))
+
+    def __iter__(self) -> Iterator[OutputLetter]:
+        """Iterate over the letters of the word generated by the program.
+
+        Only a stack of at most the depth of the program is stored, so the
+        word can be consumed without storing it.
+        """
+        stack: List[Union[int, Tuple[OutputLetter, ...]]] = []
+        if self.start is not None:
+            stack.append(self.start)
+        while len(stack) > 0:
+            item = stack.pop()
+            if isinstance(item, tuple):
+                yield from item
+                continue
+            left, middle, right = self.rules[item]
+            if right is not None:
+                stack.append(right)
+            if len(middle) > 0:
+                stack.append(middle)
+            if left is not None:
+                stack.append(left)
+
+    def expand(self) -> OutputWord:
+        """Return the word generated by the program.
+
+        Returns
+        -------
+        OutputWord
+            The word generated by the program.
+        """
+        return list(self)
+
+    def word_hash(self) -> int:
+        """Return a polynomial hash of the word generated by the program.
+
+        Returns
+        -------
+        int
+            The value :math:`\\sum_i (w_i + 1) B^{n - i - 1} \\bmod P` where
+            :math:`w = w_0 \\cdots w_{n - 1}` is the word generated by the
+            program, :math:`P = 2^{61} - 1` and :math:`B = 1000003`.
+
+        Notes
+        -----
+        The hash only depends on the generated word and not the rules, so
+        programs generating the same word have the same hash. It is computed
+        bottom-up from the rules, without expanding the word.
+        """
+        hashes: List[int] = []
+        for left, middle, right in self.rules:
+            value = 0 if left is None else hashes[left]
+            for letter in middle:
+                value = (value * _HASH_BASE + letter + 1) % _HASH_MODULUS
+            if right is not None:
+                value = (
+                    value * pow(_HASH_BASE, self.lengths[right], _HASH_MODULUS)
+                    + hashes[right]
+                ) % _HASH_MODULUS
+            hashes.append(value)
+        return 0 if self.start is None else hashes[self.start]
@@ -0,0 +1,388 @@
+"""A store of free band elements sharing their states.
+
+Minimal transducers representing different elements often have many states in
+common, for example if the elements have common factors. An
+:class:`ElementStore` keeps a single copy of every such state, so that an
+element is represented by a single state id.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from freebandlib.multiply import MultiplicationProfile, compute_k
+from freebandlib.transducer import (
+    StateId,
+    Transducer,
+    minimal_transducer,
+    transducer_topological_order,
+    transducer_trim,
+)
+from freebandlib.words import OutputLetter, OutputWord
+
+# The children and output letters of a non-terminal state.
+Signature = Tuple[StateId, StateId, OutputLetter, OutputLetter]
+
+
+class ElementStore:
+    """A store of elements of a free band, in which states are shared.
+
+    Attributes
+    ----------
+    empty_word: StateId
+        The root of the element represented by the empty word, which is the
+        only terminal state of the store.
+
+    Notes
+    -----
+    All of the elements in the store are represented by a single acyclic
+    transducer, with one terminal state, whose states are *hash-consed*: a
+    state is only created if there is no state with the same children and
+    output letters already. By induction, no two states of the store induce
+    isomorphic subtransducers, so the subtransducer induced by every state is
+    minimal, and two states represent the same element if and only if they
+    are equal. An element is stored as the id of its state, called its root.
+
+    Every function returning a root increments the number of references to
+    it, which are decremented by :meth:`release`. The states that can not be
+    reached from a root with a positive number of references are reclaimed by
+    :meth:`collect`, and their ids are reused afterwards. Hence a root must
+    not be used after its last reference is released and :meth:`collect` is
+    called, since it may then be the root of a different element.
+    """
+
+    empty_word: StateId = 0
+
+    def __init__(self):
+        self._dag = Transducer(None, [[None, None]], [[None, None]], [True])
+        self._signature_to_state: Dict[Signature, StateId] = {}
+        self._free: List[StateId] = []
+        self._refcounts: Dict[StateId, int] = {}
+
+    @property
+    def nr_states(self) -> int:
+        """The number of states in the store, including the terminal state."""
+        return self._dag.nr_states - len(self._free)
+
+    def _intern(self, signature: Signature) -> StateId:
+        # Return the state with the given signature, creating it if necessary.
+        state = self._signature_to_state.get(signature)
+        if state is not None:
+            return state
+        if len(self._free) > 0:
+            state = self._free.pop()
+            self._dag.set_transition(state, 0, signature[0], signature[2])
+            self._dag.set_transition(state, 1, signature[1], signature[3])
+        else:
+            state = self._dag.add_state(
+                [signature[0], signature[1]],
+                [signature[2], signature[3]],
+                False,
+            )
+        self._signature_to_state[signature] = state
+        return state
+
+    def _is_state(self, state: StateId) -> bool:
+        # Free states are non-terminal and have no transitions.
+        return (
+            isinstance(state, int)
+            and 0 <= state < self._dag.nr_states
+            and (state == 0 or self._dag.next_state[state][0] is not None)
+        )
+
+    def _check_root(self, root: StateId) -> None:
+        if not self._is_state(root):
+            raise RuntimeError(f"expected a state of the store, found {root}")
+
+    def _retain(self, root: StateId) -> StateId:
+        self._refcounts[root] = self._refcounts.get(root, 0) + 1
+        return root
+
+    def _view(self, root: StateId) -> Transducer:
+        # A transducer sharing the lists of the store, with initial state root.
+        # A view must only be read, and only until the store is next modified,
+        # since it sees every change to the store but its version and spine
+        # index are not updated.
+        return Transducer._from_lists(
+            root,
+            self._dag.next_state,
+            self._dag.next_letter,
+            self._dag.terminal,
+        )
+
+    def add(self, transducer: Transducer) -> StateId:
+        """Add the element represented by a transducer to the store.
+
+        Parameters
+        ----------
+        transducer: Transducer
+            A transducer representing an element of a free band.
+
+        Returns
+        -------
+        StateId
+            The root of the element.
+
+        Raises
+        ------
+        RuntimeError
+            If `transducer` does not represent any element, i.e. if its trim
+            transducer has no initial state.
+
+        Notes
+        -----
+        The states of the trim transducer of `transducer` are added in
+        reverse topological order, and each is merged with an existing state
+        with the same signature, if any. This minimizes the transducer as in
+        :func:`transducer_minimize`, without creating a new transducer.
+        """
+        transducer = transducer_trim(transducer)
+        if transducer.initial is None:
+            raise RuntimeError("the argument must represent an element")
+        topo_order = transducer_topological_order(transducer)
+        # The following assertion will always pass as our transducers are
+        # assumed to be acyclic
+        assert topo_order is not None
+        states: List[StateId] = [self.empty_word] * transducer.nr_states
+        for state in reversed(topo_order):
+            if transducer.terminal[state]:
+                continue
+            child0, child1 = transducer.next_state[state]
+            letter0, letter1 = transducer.next_letter[state]
+            assert child0 is not None and child1 is not None
+            assert letter0 is not None and letter1 is not None
+            states[state] = self._intern(
+                (states[child0], states[child1], letter0, letter1)
+            )
+        return self._retain(states[transducer.initial])
+
+    def add_word(self, word: OutputWord) -> StateId:
+        """Add the element represented by a word to the store.
+
+        Parameters
+        ----------
+        word: OutputWord
+            A word over the output alphabet.
+
+        Returns
+        -------
+        StateId
+            The root of the element.
+        """
+        return self.add(minimal_transducer(word))
+
+    def multiply(self, root_x: StateId, root_y: StateId) -> StateId:
+        """Add the product of two elements of the store to the store.
+
+        Parameters
+        ----------
+        root_x: StateId
+            The root of an element :math:`x` of the store.
+        root_y: StateId
+            The root of an element :math:`y` of the store.
+
+        Returns
+        -------
+        StateId
+            The root of :math:`xy`.
+
+        Raises
+        ------
+        RuntimeError
+            If `root_x` or `root_y` is not a state of the store.
+
+        Notes
+        -----
+        Implements the `Multiply` algorithm of THEPAPER, see :func:`multiply`.
+        The states of the product that are not states of :math:`x` or
+        :math:`y` are added to the store directly, in reverse topological
+        order, so the product is minimal without calling
+        :func:`transducer_minimize`, and the states of :math:`x` and :math:`y`
+        are not copied.
+        """
+        self._check_root(root_x)
+        self._check_root(root_y)
+        if root_y == self.empty_word or root_x == root_y:
+            return self._retain(root_x)
+        if root_x == self.empty_word:
+            return self._retain(root_y)
+
+        view_x, view_y = self._view(root_x), self._view(root_y)
+        profile_x = MultiplicationProfile(view_x)
+        profile_y = MultiplicationProfile(view_y)
+        K0 = compute_k(0, view_x, view_y, profile_x, profile_y)
+        K1 = compute_k(1, view_x, view_y, profile_x, profile_y)
+        q_x, letters_x = profile_x.spine1, profile_x.letters1
+        q_y, letters_y = profile_y.spine0, profile_y.letters0
+        size_x, size_y = len(q_x) - 1, len(q_y) - 1
+        next_state = self._dag.next_state
+        next_letter = self._dag.next_letter
+
+        # The state (i, j) of the product with i = size_x or j = size_y is
+        # equivalent to the state q_y[j] or q_x[i], respectively, so only the
+        # other states (i, j) reachable from (0, 0) are created.
+        reachable = [[False] * size_y for _ in range(size_x)]
+        reachable[0][0] = True
+        for i in range(size_x):
+            for j in range(size_y):
+                if not reachable[i][j]:
+                    continue
+                k0, k1 = K0[i][j], K1[i][j]
+                if k0 is not None and j + k0 < size_y:
+                    reachable[i][j + k0] = True
+                if k1 is not None and i + k1 < size_x:
+                    reachable[i + k1][j] = True
+
+        product: List[List[Optional[StateId]]] = [
+            [None] * size_y + [q_x[i]] for i in range(size_x)
+        ]
+        product.append(list(q_y))
+        for i in range(size_x - 1, -1, -1):
+            for j in range(size_y - 1, -1, -1):
+                if not reachable[i][j]:
+                    continue
+                k0, k1 = K0[i][j], K1[i][j]
+                child0: Optional[StateId]
+                child1: Optional[StateId]
+                if k0 is not None:
+                    child0 = product[i][j + k0]
+                    letter0 = letters_y[j + k0 - 1]
+                else:
+                    child0 = next_state[q_x[i]][0]
+                    letter0 = next_letter[q_x[i]][0]
+                if k1 is not None:
+                    child1 = product[i + k1][j]
+                    letter1 = letters_x[i + k1 - 1]
+                else:
+                    child1 = next_state[q_y[j]][1]
+                    letter1 = next_letter[q_y[j]][1]
+                assert child0 is not None and child1 is not None
+                assert letter0 is not None and letter1 is not None
+                product[i][j] = self._intern((child0, child1, letter0, letter1))
+        assert product[0][0] is not None
+        return self._retain(product[0][0])
+
+    def transducer(self, root: StateId) -> Transducer:
+        """Return the minimal transducer of an element of the store.
+
+        Parameters
+        ----------
+        root: StateId
+            The root of an element of the store.
+
+        Returns
+        -------
+        Transducer
+            The minimal transducer representing the element, which does not
+            share any data with the store.
+
+        Raises
+        ------
+        RuntimeError
+            If `root` is not a state of the store.
+        """
+        self._check_root(root)
+        index: Dict[StateId, StateId] = {root: 0}
+        order: List[StateId] = [root]
+        i = 0
+        while i < len(order):
+            for child in self._dag.next_state[order[i]]:
+                if child is not None and child not in index:
+                    index[child] = len(order)
+                    order.append(child)
+            i += 1
+        return Transducer._from_lists(
+            0,
+            [
+                [None if child is None else index[child] for child in children]
+                for children in map(self._dag.next_state.__getitem__, order)
+            ],
+            [self._dag.next_letter[state][:] for state in order],
+            [state == self.empty_word for state in order],
+        )
+
+    def refcount(self, root: StateId) -> int:
+        """Return the number of references to a root.
+
+        Parameters
+        ----------
+        root: StateId
+            A state of the store.
+
+        Returns
+        -------
+        int
+            The number of times `root` was returned by the store, minus the
+            number of times it was released.
+        """
+        return self._refcounts.get(root, 0)
+
+    def release(self, root: StateId) -> None:
+        """Release a reference to a root.
+
+        Parameters
+        ----------
+        root: StateId
+            A root returned by the store.
+
+        Raises
+        ------
+        RuntimeError
+            If there are no references to `root`.
+
+        Notes
+        -----
+        The states of the element are not reclaimed until :meth:`collect` is
+        called. If this is the last reference to `root`, then `root` must not
+        be used after :meth:`collect` is called, since its id may be reused by
+        a different element.
+        """
+        count = self._refcounts.get(root, 0)
+        if count == 0:
+            raise RuntimeError(f"there are no references to {root}")
+        if count == 1:
+            del self._refcounts[root]
+        else:
+            self._refcounts[root] = count - 1
+
+    def collect(self) -> int:
+        """Reclaim the states not reachable from a referenced root.
+
+        Returns
+        -------
+        int
+            The number of states reclaimed.
+
+        Notes
+        -----
+        The states reachable from the roots with a positive number of
+        references are marked by a depth-first search, and every other state
+        is removed from the store, except for the terminal state. The ids of
+        the removed states are reused by later calls, so a root that was
+        reclaimed may later be the root of a different element. Until then,
+        using it raises a `RuntimeError`.
+        """
+        next_state = self._dag.next_state
+        marked = [False] * self._dag.nr_states
+        marked[self.empty_word] = True
+        stack = list(self._refcounts)
+        while len(stack) > 0:
+            state = stack.pop()
+            if marked[state]:
+                continue
+            marked[state] = True
+            stack.extend(
+                child for child in next_state[state] if child is not None
+            )
+        nr_reclaimed = 0
+        for state, is_marked in enumerate(marked):
+            if is_marked or next_state[state][0] is None:
+                continue
+            child0, child1 = next_state[state]
+            letter0, letter1 = self._dag.next_letter[state]
+            assert child0 is not None and child1 is not None
+            assert letter0 is not None and letter1 is not None
+            del self._signature_to_state[(child0, child1, letter0, letter1)]
+            self._dag.set_transition(state, 0, None, None)
+            self._dag.set_transition(state, 1, None, None)
+            self._free.append(state)
+            nr_reclaimed += 1
+        return nr_reclaimed
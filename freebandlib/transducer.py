@@ -21,8 +21,10 @@ For more information see Sections 3 and 4 of THEPAPER.
 
 from __future__ import annotations
 
+from hashlib import blake2b
 from typing import Dict, List, Optional, Tuple, Set
 
+from freebandlib.cache import cached
 from freebandlib.digraph import (
     DigraphAdjacencyList,
     digraph_is_reachable,
@@ -34,6 +36,8 @@ from freebandlib.words import (
     InputWord,
     OutputLetter,
     OutputWord,
+    _decode_ints,
+    _encode_ints,
     compute_left,
     compute_right,
     cont,
@@ -67,6 +71,16 @@ class Transducer:
         A list of node labels. These are optional and only serve a purpose for
         debugging or visualising.
 
+    Attributes
+    ----------
+    spine_index: Optional[SpineIndex]
+        An optional index of jump pointers along the spines of the transducer,
+        see :func:`transducer_index_spines`. It is reset to `None` whenever a
+        state is added or a transition is modified.
+    version: int
+        The number of times the transducer was modified by :meth:`add_state`,
+        :meth:`set_transition` or :meth:`set_terminal`.
+
     Notes
     -----
     We assume that our transducers are synchronous, deterministic and acyclic,
@@ -79,8 +93,24 @@ class Transducer:
     state transition and letter transition functions as lists, where the
     :math:`i`-th entry corresponds to the transition upon reading :math:`i` (if
     this transition is defined and `None` otherwise).
+
+    Copies made by :meth:`copy` have their own lists `next_state`,
+    `next_letter` and `terminal`, but share the list of transitions of each
+    state with the original, until the transitions of that state are modified
+    by :meth:`set_transition` in either transducer, which copies them first.
+    Hence the transitions of a transducer that has been copied must only be
+    modified by :meth:`set_transition`. The transducers returned by the
+    other functions of this library, such as :func:`multiply`, do not share
+    any lists with their arguments, except for :func:`multiply_letter` and
+    :func:`multiply_generators`, whose results are made by :meth:`copy`.
     """
 
+    # The defaults of the attributes added after version 0.0.1, which are
+    # missing from the transducers pickled by that version.
+    spine_index: Optional[SpineIndex] = None
+    version: int = 0
+    _owned: Optional[Set[StateId]] = None
+
     def __init__(
         self,
         initial: Optional[StateId],
@@ -94,22 +124,104 @@ class Transducer:
         self.next_state = next_state
         self.terminal = terminal
         self.label = label
+        self.spine_index = None
+        self.version = 0
+        # The states whose lists of transitions are not shared with a copy, or
+        # None if no state's are.
+        self._owned: Optional[Set[StateId]] = None
         self.validate()
 
+    @classmethod
+    def _from_lists(
+        cls,
+        initial: Optional[StateId],
+        next_state: List[List[Optional[StateId]]],
+        next_letter: List[List[Optional[OutputLetter]]],
+        terminal: List[bool],
+    ) -> Transducer:
+        # Return the transducer with the given lists, which are assumed to be
+        # valid, so they are not checked as in the constructor. The lists are
+        # not copied.
+        result = cls.__new__(cls)
+        result.initial = initial
+        result.next_state = next_state
+        result.next_letter = next_letter
+        result.terminal = terminal
+        result.label = None
+        result.spine_index = None
+        result.version = 0
+        result._owned = None
+        return result
+
     @property
     def nr_states(self) -> int:
         """The number of states used by the transducer."""
         return len(self.next_letter)
 
     def copy(self) -> Transducer:
-        """Create a copy of the transducer."""
-        return Transducer(
+        """Create a copy of the transducer.
+
+        The copy shares the transitions of each state with the transducer
+        until either of them modifies them, see the notes of
+        :class:`Transducer`, so no transitions are copied.
+        """
+        result = Transducer._from_lists(
             self.initial,
             self.next_state[::],
             self.next_letter[::],
             self.terminal[::],
-            self.label[::] if self.label is not None else None,
         )
+        result.label = self.label[::] if self.label is not None else None
+        result.spine_index = self.spine_index
+        result._owned, self._owned = set(), set()
+        return result
+
+    def set_transition(
+        self,
+        state: StateId,
+        letter: InputLetter,
+        next_state: Optional[StateId],
+        next_letter: Optional[OutputLetter],
+    ) -> None:
+        """Set the transition of a state upon reading an input letter.
+
+        Parameters
+        ----------
+        state: StateId
+            A state of the transducer.
+        letter: InputLetter
+            An input letter, i.e. `0` or `1`.
+        next_state: Optional[StateId]
+            The state reached from `state` upon reading `letter`.
+        next_letter: Optional[OutputLetter]
+            The letter output upon reading `letter` in `state`.
+
+        Notes
+        -----
+        If the transitions of `state` are shared with a copy, then they are
+        copied first, so the copy is not modified.
+        """
+        if self._owned is not None and state not in self._owned:
+            self.next_state[state] = self.next_state[state][::]
+            self.next_letter[state] = self.next_letter[state][::]
+            self._owned.add(state)
+        self.next_state[state][letter] = next_state
+        self.next_letter[state][letter] = next_letter
+        self.spine_index = None
+        self.version += 1
+
+    def set_terminal(self, state: StateId, is_terminal: bool) -> None:
+        """Set whether a state is terminal.
+
+        Parameters
+        ----------
+        state: StateId
+            A state of the transducer.
+        is_terminal: bool
+            A boolean indicating if the state is terminal.
+        """
+        self.terminal[state] = is_terminal
+        self.version += 1
 
     def validate(self):
         """Check that the transducer is valid."""
@@ -212,10 +324,15 @@ class Transducer:
         StateId
             The state that was added to the transducer.
         """
+        state = len(self.terminal)
         self.next_state.append(next_state)
         self.next_letter.append(next_letter)
         self.terminal.append(is_terminal)
-        return self.nr_states - 1
+        if self._owned is not None:
+            self._owned.add(state)
+        self.spine_index = None
+        self.version += 1
+        return state
 
     def traverse(self, word: InputWord) -> Optional[OutputWord]:
         """Traverse an input word through the transducer and return its output.
@@ -276,6 +393,189 @@ class Transducer:
         return result
 
 
+def _copy_transducer(transducer: Transducer) -> Transducer:
+    # Unlike Transducer.copy, this copies the transitions of every state right
+    # away, so that the transitions of the result can also be modified
+    # directly without modifying the input.
+    return Transducer._from_lists(
+        transducer.initial,
+        list(map(list.copy, transducer.next_state)),
+        list(map(list.copy, transducer.next_letter)),
+        transducer.terminal[::],
+    )
+
+
+def _freeze_transducer(transducer: Transducer) -> Tuple:
+    # Return the initial state, transitions and terminal states of transducer
+    # as tuples. Unlike lists, tuples of integers are not tracked by the garbage
+    # collector, so the caches store transducers in this form.
+    return (
+        transducer.initial,
+        tuple(map(tuple, transducer.next_state)),
+        tuple(map(tuple, transducer.next_letter)),
+        tuple(transducer.terminal),
+    )
+
+
+def _thaw_transducer(frozen: Tuple) -> Transducer:
+    # The inverse of _freeze_transducer.
+    return Transducer._from_lists(
+        frozen[0],
+        list(map(list, frozen[1])),
+        list(map(list, frozen[2])),
+        list(frozen[3]),
+    )
+
+
+class SpineIndex:
+    """Jump pointers along the spines of a transducer.
+
+    Parameters
+    ----------
+    transducer: Transducer
+        An acyclic transducer.
+
+    Attributes
+    ----------
+    depth: List[List[int]]
+        The value `depth[letter][state]` is the number of transitions labelled
+        by the input letter `letter` that can be followed from `state`.
+    jump: List[List[List[Optional[StateId]]]]
+        The value `jump[letter][j][state]` is the state reached from `state`
+        by following :math:`2^j` transitions labelled by `letter`, or `None`
+        if there are fewer such transitions.
+
+    See Also
+    --------
+    transducer_index_spines: For attaching an index to a transducer.
+
+    Notes
+    -----
+    For a transducer representing an element of a free band, the spine of a
+    state along either input letter has length equal to the size of the
+    content of the element, so this index allows the :math:`k`-th state along
+    a spine to be found in :math:`O(\\log |A|)` rather than :math:`O(|A|)`
+    time, and gives the size of the content of every state in constant time.
+    The index uses :math:`O(|Q| \\log |A|)` space.
+    """
+
+    def __init__(self, transducer: Transducer):
+        topo_order = transducer_topological_order(transducer)
+        if topo_order is None:
+            raise RuntimeError("the argument (a transducer) must be acyclic")
+        self.depth: List[List[int]] = []
+        self.jump: List[List[List[Optional[StateId]]]] = []
+        for letter in [0, 1]:
+            depth = [0] * transducer.nr_states
+            for state in reversed(topo_order):
+                child = transducer.next_state[state][letter]
+                if child is not None:
+                    depth[state] = depth[child] + 1
+            jump = [[row[letter] for row in transducer.next_state]]
+            for _ in range(1, max(depth, default=0).bit_length()):
+                prev = jump[-1]
+                jump.append(
+                    [None if state is None else prev[state] for state in prev]
+                )
+            self.depth.append(depth)
+            self.jump.append(jump)
+
+    def spine_state(
+        self, state: StateId, letter: InputLetter, k: int
+    ) -> Optional[StateId]:
+        """Return the state reached by following `k` transitions on `letter`.
+
+        Parameters
+        ----------
+        state: StateId
+            The starting state.
+        letter: InputLetter
+            An input letter.
+        k: int
+            A non-negative integer.
+
+        Returns
+        -------
+        Optional[StateId]
+            The state reached from `state` by reading :math:`letter^k`, or
+            `None` if fewer than `k` transitions can be followed.
+        """
+        if k > self.depth[letter][state]:
+            return None
+        j = 0
+        result: Optional[StateId] = state
+        while k > 0:
+            if k & 1:
+                result = self.jump[letter][j][result]
+            k >>= 1
+            j += 1
+        return result
+
+
+def transducer_index_spines(transducer: Transducer) -> SpineIndex:
+    """Compute and attach a :class:`SpineIndex` to a transducer.
+
+    Parameters
+    ----------
+    transducer: Transducer
+        An acyclic transducer.
+
+    Returns
+    -------
+    SpineIndex
+        The index, which is also stored in `transducer.spine_index`.
+
+    Notes
+    -----
+    The spine helpers, such as :func:`transducer_spine_state`,
+    :func:`transducer_precompute_q` and :func:`classify_case`, use the index
+    stored in a transducer when it is present. The index is discarded by
+    :meth:`Transducer.add_state`, :meth:`Transducer.set_transition` and
+    :meth:`Transducer.set_terminal`, but it must be discarded manually, by
+    setting `transducer.spine_index` to `None`, if the lists of the
+    transducer are modified directly.
+    """
+    transducer.spine_index = SpineIndex(transducer)
+    return transducer.spine_index
+
+
+def transducer_spine_state(
+    state: StateId, letter: InputLetter, k: int, transducer: Transducer
+) -> Optional[StateId]:
+    """Return the state reached from `state` by reading `letter` `k` times.
+
+    Parameters
+    ----------
+    state: StateId
+        The starting state.
+    letter: InputLetter
+        An input letter.
+    k: int
+        A non-negative integer.
+    transducer: Transducer
+        A transducer.
+
+    Returns
+    -------
+    Optional[StateId]
+        The `k`-th entry of `transducer_precompute_q(state, letter,
+        transducer)` if it exists, and `None` otherwise.
+
+    Notes
+    -----
+    This takes :math:`O(\\log k)` time if `transducer.spine_index` is set, and
+    :math:`O(k)` time otherwise.
+    """
+    if transducer.spine_index is not None:
+        return transducer.spine_index.spine_state(state, letter, k)
+    result: Optional[StateId] = state
+    for _ in range(k):
+        if result is None:
+            return None
+        result = transducer.next_state[result][letter]
+    return result
+
+
 def transducer_connected_states(transducer: Transducer) -> List[StateId]:
     """Return all the connected state ids of a given transducer.
 
@@ -387,39 +687,28 @@ def transducer_induced_subtransducer(
     """
 
     state: StateId
-    included: List[bool] = [False for _ in range(transducer.nr_states)]
-    for state in states:
-        included[state] = True
-
     induced_subtransducer = Transducer(None, [], [], [])
+    # The states are added in the order of `states`, so their ids in the
+    # induced subtransducer are known in advance.
     state_lookup: List[Optional[StateId]] = [
         None for _ in range(transducer.nr_states)
     ]
+    for new_state, state in enumerate(states):
+        state_lookup[state] = new_state
     for state in states:
         next_state = [
-            child if child is not None and included[child] else None
+            state_lookup[child] if child is not None else None
             for child in transducer.next_state[state]
         ]
         next_letter = [
-            letter if child is not None and included[child] else None
-            for child, letter in zip(
-                transducer.next_state[state], transducer.next_letter[state]
-            )
+            letter if child is not None else None
+            for child, letter in zip(next_state, transducer.next_letter[state])
         ]
-        state_lookup[state] = induced_subtransducer.add_state(
+        induced_subtransducer.add_state(
             next_state, next_letter, transducer.terminal[state]
         )
 
-    for state in range(induced_subtransducer.nr_states):
-        for letter, child in enumerate(induced_subtransducer.next_state[state]):
-            if child is not None:
-                assert state_lookup[child] is not None
-                induced_subtransducer.next_state[state][letter] = state_lookup[
-                    child
-                ]
-
-    if transducer.initial is not None and included[transducer.initial]:
-        assert state_lookup[transducer.initial] is not None
+    if transducer.initial is not None:
         induced_subtransducer.initial = state_lookup[transducer.initial]
 
     return induced_subtransducer
@@ -536,6 +825,266 @@ def transducer_isomorphism(
     return True
 
 
+def _canonical_order(
+    transducer: Transducer,
+) -> Tuple[Dict[StateId, int], List[StateId]]:
+    # Number the states accessible from the initial state in the order they
+    # are first visited by a depth-first search from the initial state, reading
+    # the input letters in increasing order. Returns the numbers of the states,
+    # and the states in this order.
+    number: Dict[StateId, int] = {}
+    order: List[StateId] = []
+    if transducer.initial is None:
+        return number, order
+    stack: List[StateId] = [transducer.initial]
+    while len(stack) > 0:
+        state = stack.pop()
+        if state in number:
+            continue
+        number[state] = len(order)
+        order.append(state)
+        for child in reversed(transducer.next_state[state]):
+            if child is not None and child not in number:
+                stack.append(child)
+    return number, order
+
+
+def transducer_canonical_encoding(transducer: Transducer) -> Tuple[int, ...]:
+    """Return an encoding of a transducer that is invariant under isomorphism.
+
+    Parameters
+    ----------
+    transducer: Transducer
+        A transducer.
+
+    Returns
+    -------
+    Tuple[int, ...]
+        A tuple of integers, which is equal for two trim transducers if and
+        only if they are isomorphic.
+
+    See Also
+    --------
+    transducer_isomorphism: For checking if two transducers are isomorphic.
+
+    Notes
+    -----
+    The states accessible from the initial state are numbered in the order
+    they are first visited by a depth-first search from the initial state,
+    reading the input letters in increasing order. For every state, in this
+    order, the encoding then contains whether the state is terminal, followed
+    by the output letter and the number of the target of each transition,
+    where `-1` stands for `None`.
+
+    Since minimal transducers representing the same element are isomorphic,
+    the encodings of minimal transducers can be used as keys for the elements
+    they represent, for example in a dictionary.
+    """
+    number, order = _canonical_order(transducer)
+    result: List[int] = []
+    for state in order:
+        result.append(int(transducer.terminal[state]))
+        for letter, child in enumerate(transducer.next_state[state]):
+            output = transducer.next_letter[state][letter]
+            result.append(-1 if output is None else output)
+            result.append(-1 if child is None else number[child])
+    return tuple(result)
+
+
+def _fingerprint_size(bits: int) -> int:
+    # The number of bytes of a fingerprint with the given number of bits.
+    if bits not in (64, 128):
+        raise RuntimeError(
+            f"the number of bits must be 64 or 128, found {bits}"
+        )
+    return bits // 8
+
+
+def transducer_fingerprints(
+    transducer: Transducer, bits: int = 64
+) -> List[int]:
+    """Return a fingerprint of the subtransducer induced by every state.
+
+    Parameters
+    ----------
+    transducer: Transducer
+        An acyclic transducer.
+    bits: int, default=64
+        The number of bits of the fingerprints, either `64` or `128`.
+
+    Returns
+    -------
+    List[int]
+        A list whose :math:`q`-th entry is the fingerprint of the state
+        :math:`q`, a non-negative integer less than :math:`2 ^ {bits}`.
+
+    Raises
+    ------
+    RuntimeError
+        If `bits` is not `64` or `128`.
+
+    See Also
+    --------
+    transducer_fingerprint: For the fingerprint of a whole transducer.
+
+    Notes
+    -----
+    The fingerprint of a state is the BLAKE2b hash of whether it is terminal,
+    and the output letter and the fingerprint of the target of each of its
+    transitions. The states are processed in reverse topological order, so the
+    fingerprints of the children of a state are known when it is processed.
+
+    The states inducing isomorphic subtransducers, in this or any other
+    transducer, have the same fingerprint. Conversely, states with the same
+    fingerprint induce isomorphic subtransducers with high probability. So, in
+    minimal transducers, the fingerprints of states identify the elements
+    they represent. The fingerprints do not depend on the state ids or on the
+    seed of Python's built-in `hash`.
+    """
+    size = _fingerprint_size(bits)
+    topo_order = transducer_topological_order(transducer)
+    # The following assertion will always pass as our transducers are assumed
+    # to be acyclic
+    assert topo_order is not None
+    fingerprints: List[int] = [0] * transducer.nr_states
+    for state in reversed(topo_order):
+        data = bytearray(b"T" if transducer.terminal[state] else b"N")
+        for letter, child in enumerate(transducer.next_state[state]):
+            output = transducer.next_letter[state][letter]
+            if child is None or output is None:
+                data += b"\x00"
+            else:
+                data += b"\x01"
+                data += output.to_bytes(8, "little", signed=True)
+                data += fingerprints[child].to_bytes(size, "little")
+        fingerprints[state] = int.from_bytes(
+            blake2b(data, digest_size=size).digest(), "little"
+        )
+    return fingerprints
+
+
+def transducer_fingerprint(transducer: Transducer, bits: int = 64) -> int:
+    """Return a fingerprint of a transducer.
+
+    Parameters
+    ----------
+    transducer: Transducer
+        An acyclic transducer.
+    bits: int, default=64
+        The number of bits of the fingerprint, either `64` or `128`.
+
+    Returns
+    -------
+    int
+        The fingerprint of the initial state of `transducer`, see
+        :func:`transducer_fingerprints`, or `0` if there is no initial state.
+
+    Raises
+    ------
+    RuntimeError
+        If `bits` is not `64` or `128`.
+
+    Notes
+    -----
+    If two minimal transducers have different fingerprints, then they do not
+    represent the same element, and if they have the same fingerprint, then
+    they represent the same element with high probability. For example, these
+    can be passed to :func:`equal_in_free_band` to avoid comparing words that
+    are not equal.
+    """
+    if transducer.initial is None:
+        _fingerprint_size(bits)
+        return 0
+    return transducer_fingerprints(transducer, bits)[transducer.initial]
+
+
+def transducer_to_bytes(transducer: Transducer) -> bytes:
+    """Encode a transducer as bytes.
+
+    Parameters
+    ----------
+    transducer: Transducer
+        A transducer.
+
+    Returns
+    -------
+    bytes
+        The encoding of `transducer`, which can be decoded by
+        :func:`transducer_from_bytes`.
+
+    Notes
+    -----
+    The encoding is a sequence of variable length integers, see
+    :func:`word_to_bytes`: the number of states, one more than the initial
+    state (or 0 if there is none), and then for every state a bitmask of
+    whether it is terminal and which of its transitions are defined, followed
+    by the defined children and letters. A minimal transducer with fewer than
+    64 states and letters uses 5 bytes per state.
+    """
+    values = [
+        transducer.nr_states,
+        0 if transducer.initial is None else transducer.initial + 1,
+    ]
+    for state in range(transducer.nr_states):
+        fields = transducer.next_state[state] + transducer.next_letter[state]
+        values.append(
+            transducer.terminal[state]
+            + sum(2 << i for i, field in enumerate(fields) if field is not None)
+        )
+        values.extend(field for field in fields if field is not None)
+    return _encode_ints(values)
+
+
+def transducer_from_bytes(data: bytes) -> Transducer:
+    """Decode a transducer encoded by :func:`transducer_to_bytes`.
+
+    Parameters
+    ----------
+    data: bytes
+        The encoding of a transducer.
+
+    Returns
+    -------
+    Transducer
+        The transducer encoded by `data`.
+
+    Raises
+    ------
+    RuntimeError
+        If `data` is not the encoding of a transducer.
+    """
+    values = _decode_ints(data)
+    if len(values) < 2:
+        raise RuntimeError("the data must start with 2 integers")
+    nr_states, initial = values[0], values[1] - 1
+    next_state: List[List[Optional[StateId]]] = []
+    next_letter: List[List[Optional[OutputLetter]]] = []
+    terminal: List[bool] = []
+    pos = 2
+    for _ in range(nr_states):
+        if pos >= len(values):
+            raise RuntimeError("the data must contain every state")
+        mask = values[pos]
+        pos += 1
+        fields: List[Optional[int]] = []
+        for i in range(4):
+            if mask & (2 << i):
+                if pos >= len(values):
+                    raise RuntimeError("the data must contain every state")
+                fields.append(values[pos])
+                pos += 1
+            else:
+                fields.append(None)
+        terminal.append(bool(mask & 1))
+        next_state.append(fields[:2])
+        next_letter.append(fields[2:])
+    if pos != len(values):
+        raise RuntimeError("the data must not continue after the last state")
+    return Transducer(
+        None if initial == -1 else initial, next_state, next_letter, terminal
+    )
+
+
 def transducer_minimize(transducer: Transducer) -> Transducer:
     """Return the minimal transducer that is equivalent to the given one.
 
@@ -613,10 +1162,13 @@ def transducer_minimize(transducer: Transducer) -> Transducer:
 
     for state in range(trim_transducer.nr_states):
         for letter, child in enumerate(trim_transducer.next_state[state]):
-            if child is not None:
-                trim_transducer.next_state[state][letter] = representative[
-                    child
-                ]
+            if child is not None and representative[child] != child:
+                trim_transducer.set_transition(
+                    state,
+                    letter,
+                    representative[child],
+                    trim_transducer.next_letter[state][letter],
+                )
 
     return transducer_trim(trim_transducer)
 
@@ -809,7 +1361,15 @@ def transducer_precompute_q(
     """
     if state is None:
         return []
-    result: List[StateId] = []
+    if transducer.spine_index is not None:
+        # The length of the spine is known, so we can avoid growing the list.
+        result: List[StateId] = [state] * (
+            transducer.spine_index.depth[letter][state] + 1
+        )
+        for i in range(1, len(result)):
+            result[i] = transducer.next_state[result[i - 1]][letter]
+        return result
+    result = []
     while state is not None:
         result.append(state)
         state = transducer.next_state[state][letter]
@@ -846,6 +1406,14 @@ def transducer_cont(
     return content
 
 
+@cached(
+    key=lambda word: tuple(word),
+    size=lambda transducer, word: len(word) + transducer.nr_states,
+    copy=_thaw_transducer,
+    encode=transducer_to_bytes,
+    decode=transducer_from_bytes,
+    store=_freeze_transducer,
+)
 def minimal_transducer(word: OutputWord) -> Transducer:
     """Return the minimal transducer representing `word`.
 
@@ -862,5 +1430,72 @@ def minimal_transducer(word: OutputWord) -> Transducer:
     See Also
     --------
     transducer_minimize: For minimizing a transducer.
+    interval_transducer: For the interval transducer of a word.
+
+    Notes
+    -----
+    The result is the same as `transducer_minimize(interval_transducer(word))`
+    up to isomorphism, but the two steps are fused. The states of the interval
+    transducer are created one level of content at a time, and every state is
+    merged with any earlier state having the same transitions as soon as it is
+    created, as in :func:`transducer_minimize`. Since the children of a state
+    lie on the level below it, only the intervals of the previous level are
+    kept in memory, rather than those of every level, and the interval
+    transducer is never built.
+
+    If the cache is enabled, see :func:`enable_cache`, then the result is
+    cached with key `word`, and the same holds for the persistent cache, see
+    :func:`enable_disk_cache`.
     """
-    return transducer_minimize(interval_transducer(word))
+    if len(word) == 0:
+        return Transducer(0, [[None, None]], [[None, None]], [True])
+
+    transducer = Transducer(None, [[None, None]], [[None, None]], [True])
+    # Maps the transitions of each state to its id, so that equivalent states
+    # are created only once.
+    state_tuple_to_state: Dict[
+        Tuple[StateId, StateId, OutputLetter, OutputLetter], StateId
+    ] = {}
+    # The rights, lefts and states of the intervals of the previous level.
+    prev_right: List[Optional[int]] = []
+    prev_left: List[Optional[int]] = []
+    prev_lookup: Dict[Tuple[int, int], StateId] = {}
+    for k in range(1, len(cont(word)) + 1):
+        right = compute_right(k, word)
+        left = compute_left(k, word)
+        lookup: Dict[Tuple[int, int], StateId] = {}
+        intervals = [(i, j) for i, j in enumerate(right) if j is not None]
+        intervals.extend((i, j) for j, i in enumerate(left) if i is not None)
+        for i, j in intervals:
+            if (i, j) in lookup:
+                continue
+            if k == 1:
+                state_tuple = (0, 0, word[i], word[i])
+            else:
+                rr = prev_right[i]
+                ll = prev_left[j]
+                assert rr is not None
+                assert ll is not None
+                state_tuple = (
+                    prev_lookup[(i, rr)],
+                    prev_lookup[(ll, j)],
+                    word[rr + 1],
+                    word[ll - 1],
+                )
+            state = state_tuple_to_state.get(state_tuple)
+            if state is None:
+                state = transducer.add_state(
+                    [state_tuple[0], state_tuple[1]],
+                    [state_tuple[2], state_tuple[3]],
+                    False,
+                )
+                state_tuple_to_state[state_tuple] = state
+            lookup[(i, j)] = state
+        prev_right, prev_left, prev_lookup = right, left, lookup
+
+    transducer.initial = prev_lookup[(0, len(word) - 1)]
+    # The tables are not needed by the trimmed copy, so release them first.
+    del state_tuple_to_state, prev_right, prev_left, prev_lookup
+    del right, left, lookup, intervals
+    # Some intervals are not reachable from the whole word.
+    return transducer_trim(transducer)
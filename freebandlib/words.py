@@ -35,6 +35,62 @@ def cont(word: OutputWord) -> Set[OutputLetter]:
     return set(word)
 
 
+def first_occurrence_order(word: OutputWord) -> OutputWord:
+    """Return the letters of a word in the order they first occur.
+
+    Parameters
+    ----------
+    word: OutputWord
+        A word over the output alphabet.
+
+    Returns
+    -------
+    OutputWord
+        The word containing each letter of `word` exactly once, in the order
+        of their first occurrences in `word`.
+
+    See Also
+    --------
+    last_occurrence_order: The dual of this function.
+
+    Notes
+    -----
+    Two words are equal in the free left regular band if and only if they
+    have the same first occurrence order, so this is a necessary condition for
+    equality in the free band.
+    """
+    return list(dict.fromkeys(word))
+
+
+def last_occurrence_order(word: OutputWord) -> OutputWord:
+    """Return the letters of a word in the order they last occur.
+
+    Parameters
+    ----------
+    word: OutputWord
+        A word over the output alphabet.
+
+    Returns
+    -------
+    OutputWord
+        The word containing each letter of `word` exactly once, in the order
+        of their last occurrences in `word`.
+
+    See Also
+    --------
+    first_occurrence_order: The dual of this function.
+
+    Notes
+    -----
+    Two words are equal in the free right regular band if and only if they
+    have the same last occurrence order, so this is a necessary condition for
+    equality in the free band.
+    """
+    result = list(dict.fromkeys(reversed(word)))
+    result.reverse()
+    return result
+
+
 def pref_ltof(
     word: OutputWord,
 ) -> Tuple[Optional[OutputWord], Optional[OutputLetter]]:
@@ -215,3 +271,75 @@ def compute_left(k: int, word: OutputWord) -> List[Optional[int]]:
         for x in compute_right(k, list(reversed(word)))
     ]
     return list(reversed(result))
+
+
+def _encode_ints(values: List[int]) -> bytes:
+    # Each integer is mapped to a non-negative one by zigzag encoding, i.e. 0,
+    # -1, 1, -2, ... are mapped to 0, 1, 2, 3, ..., and then written as a
+    # little-endian base 128 varint, whose last byte has its top bit clear.
+    result = bytearray()
+    for value in values:
+        value = 2 * value if value >= 0 else -2 * value - 1
+        while value >= 0x80:
+            result.append((value & 0x7F) | 0x80)
+            value >>= 7
+        result.append(value)
+    return bytes(result)
+
+
+def _decode_ints(data: bytes) -> List[int]:
+    # The inverse of _encode_ints.
+    result: List[int] = []
+    value, shift = 0, 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if byte < 0x80:
+            result.append(value >> 1 if value % 2 == 0 else -(value >> 1) - 1)
+            value, shift = 0, 0
+    if shift != 0:
+        raise RuntimeError("the data must not end in the middle of an integer")
+    return result
+
+
+def word_to_bytes(word: OutputWord) -> bytes:
+    """Encode a word as bytes.
+
+    Parameters
+    ----------
+    word: OutputWord
+        A word over the output alphabet.
+
+    Returns
+    -------
+    bytes
+        The encoding of `word`, which can be decoded by
+        :func:`word_from_bytes`.
+
+    Notes
+    -----
+    Every letter is written as a variable length integer, so that letters in
+    the range :math:`[-64, 64)` take up a single byte.
+    """
+    return _encode_ints(word)
+
+
+def word_from_bytes(data: bytes) -> OutputWord:
+    """Decode a word encoded by :func:`word_to_bytes`.
+
+    Parameters
+    ----------
+    data: bytes
+        The encoding of a word.
+
+    Returns
+    -------
+    OutputWord
+        The word encoded by `data`.
+
+    Raises
+    ------
+    RuntimeError
+        If `data` is not the encoding of a word.
+    """
+    return _decode_ints(data)
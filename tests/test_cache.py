@@ -0,0 +1,204 @@
+""" Tests for freebandlib.cache """
+
+from random import randint, seed
+
+import freebandlib.cache
+import pytest
+from freebandlib.cache import (
+    CacheInfo,
+    cache_clear,
+    cache_info,
+    cached,
+    disable_cache,
+    disable_disk_cache,
+    enable_cache,
+    enable_disk_cache,
+)
+from freebandlib.equality import equal_in_free_band
+from freebandlib.minword import normal_form
+from freebandlib.multiply import multiply
+from freebandlib.transducer import (
+    interval_transducer,
+    minimal_transducer,
+    transducer_isomorphism,
+    transducer_minimize,
+)
+
+
+@pytest.fixture
+def cache():
+    enable_cache()
+    yield
+    disable_cache()
+
+
+def test_cache_info(cache):
+    assert cache_info() == CacheInfo(0, 0, 0, 0, 1 << 22)
+    minimal_transducer([0, 1, 0])
+    minimal_transducer([0, 1, 0])
+    minimal_transducer([1, 0, 1])
+    info = cache_info()
+    assert info is not None
+    assert (info.hits, info.misses, info.nr_entries) == (1, 2, 2)
+    cache_clear()
+    assert cache_info() == CacheInfo(0, 0, 0, 0, 1 << 22)
+    disable_cache()
+    assert cache_info() is None
+    minimal_transducer([0, 1, 0])
+    assert cache_info() is None
+
+
+def test_cache_eviction(cache):
+    calls = []
+
+    @cached(key=lambda n: n, size=lambda result, n: n)
+    def identity(n):
+        calls.append(n)
+        return n
+
+    enable_cache(10)
+    for n in [4, 5, 4, 6]:
+        assert identity(n) == n
+    # 4 was used more recently than 5, so 5 is evicted when 6 is added.
+    assert calls == [4, 5, 6]
+    assert cache_info() == CacheInfo(1, 3, 2, 10, 10)
+    identity(4)
+    identity(5)
+    assert calls == [4, 5, 6, 5]
+    # Entries larger than the cache are not stored.
+    identity(11)
+    identity(11)
+    assert calls == [4, 5, 6, 5, 11, 11]
+    enable_cache(4)
+    assert cache_info() == CacheInfo(2, 6, 0, 0, 4)
+
+    with pytest.raises(RuntimeError):
+        enable_cache(-1)
+
+
+def test_cache_store(cache):
+    @cached(
+        key=lambda n: n,
+        size=lambda result, n: n,
+        copy=list,
+        store=tuple,
+    )
+    def count(n):
+        return list(range(n))
+
+    result = count(3)
+    result.append(3)
+    assert count(3) == [0, 1, 2]
+    assert isinstance(count(3), list)
+    assert cache_info() == CacheInfo(2, 1, 1, 3, 1 << 22)
+
+
+def test_cache_copies(cache):
+    word = [0, 1, 2, 0, 1]
+    transducer = minimal_transducer(word)
+    transducer.next_letter[transducer.initial][0] = 3
+    transducer.terminal[0] = not transducer.terminal[0]
+    assert transducer_isomorphism(
+        minimal_transducer(word),
+        transducer_minimize(interval_transducer(word)),
+    )
+
+    x, y = minimal_transducer([0, 1]), minimal_transducer([1, 2])
+    product = multiply(x, y)
+    product.next_state[product.initial][0] = None
+    assert transducer_isomorphism(
+        transducer_minimize(multiply(x, y)), minimal_transducer([0, 1, 2])
+    )
+
+
+def test_cache_modified_transducers(cache):
+    y = minimal_transducer([1, 2])
+    for direct in (False, True):
+        x = minimal_transducer([0, 1])
+        multiply(x, y)
+        # Replace the letter 1 by 3, so that x represents [0, 3].
+        for state in range(x.nr_states):
+            for letter in (0, 1):
+                if x.next_letter[state][letter] != 1:
+                    continue
+                if direct:
+                    x.next_letter[state][letter] = 3
+                else:
+                    x.set_transition(
+                        state, letter, x.next_state[state][letter], 3
+                    )
+        assert transducer_isomorphism(
+            transducer_minimize(multiply(x, y)),
+            minimal_transducer([0, 3, 1, 2]),
+        )
+
+
+def test_cache_random(cache):
+    seed(47)
+    enable_cache(1000)
+    for _ in range(200):
+        u = [randint(0, 2) for _ in range(randint(0, 8))]
+        v = [randint(0, 2) for _ in range(randint(0, 8))]
+        x, y = minimal_transducer(u), minimal_transducer(v)
+        assert transducer_isomorphism(
+            x, transducer_minimize(interval_transducer(u))
+        )
+        assert transducer_isomorphism(
+            transducer_minimize(multiply(x, y)), minimal_transducer(u + v)
+        )
+        assert equal_in_free_band(u, v) == transducer_isomorphism(
+            x, minimal_transducer(v)
+        )
+    info = cache_info()
+    assert info is not None
+    assert info.hits > 0
+    assert info.size <= 1000
+
+
+def test_disk_cache(tmp_path):
+    path = str(tmp_path / "cache.db")
+    word = [0, 1, 2, 0, 1, 0, 2]
+    expected = minimal_transducer(word)
+    expected_normal_form = normal_form(word)
+    disk_cache = enable_disk_cache(path)
+    minimal_transducer(word)
+    assert normal_form(word) == expected_normal_form
+    # normal_form finds the minimal transducer of word in the file.
+    assert (disk_cache.hits, disk_cache.misses) == (1, 2)
+    assert disk_cache.nr_entries == 2
+    disable_disk_cache()
+
+    disk_cache = enable_disk_cache(path)
+    enable_cache()
+    for _ in range(2):
+        result = minimal_transducer(word)
+        assert (result.next_state, result.next_letter, result.terminal) == (
+            expected.next_state,
+            expected.next_letter,
+            expected.terminal,
+        )
+        assert normal_form(word) == expected_normal_form
+    # The second time, the results are found in memory.
+    assert (disk_cache.hits, disk_cache.misses) == (2, 0)
+    # The results of equal_in_free_band are not stored in the file.
+    assert equal_in_free_band(word, expected_normal_form)
+    assert disk_cache.nr_entries == 2
+    disable_cache()
+    disable_disk_cache()
+
+
+def test_disk_cache_format(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.db")
+    word = [0, 1, 2, 0, 1]
+    disk_cache = enable_disk_cache(path)
+    minimal_transducer(word)
+    minimal_transducer(word)
+    assert (disk_cache.hits, disk_cache.misses) == (1, 1)
+    disable_disk_cache()
+    # The entries written with another format are not read.
+    monkeypatch.setattr(freebandlib.cache, "_DISK_FORMAT", 0)
+    disk_cache = enable_disk_cache(path)
+    minimal_transducer(word)
+    assert (disk_cache.hits, disk_cache.misses) == (0, 1)
+    assert disk_cache.nr_entries == 2
+    disable_disk_cache()
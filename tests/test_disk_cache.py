@@ -0,0 +1,70 @@
+""" Tests for freebandlib.disk_cache """
+
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from freebandlib.disk_cache import DiskCache
+
+
+def _put_and_get(args):
+    cache, i = args
+    cache.put(bytes([i]), bytes([i] * i))
+    return cache.get(bytes([i]))
+
+
+def test_disk_cache_get_put(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = DiskCache(path)
+    assert cache.get(b"a") is None
+    cache.put(b"a", b"123")
+    cache.put(b"b", b"")
+    # The value of a key is never replaced.
+    cache.put(b"a", b"456")
+    assert cache.get(b"a") == b"123"
+    assert cache.get(b"b") == b""
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert (cache.nr_entries, cache.size) == (2, 5)
+    cache.close()
+
+    cache = DiskCache(path)
+    assert cache.get(b"a") == b"123"
+    assert (cache.nr_entries, cache.size) == (2, 5)
+    cache.clear()
+    assert cache.get(b"a") is None
+    assert (cache.nr_entries, cache.size) == (0, 0)
+    cache.close()
+
+    with pytest.raises(RuntimeError):
+        DiskCache(path, -1)
+
+
+def test_disk_cache_eviction(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.db"), 10)
+    cache.put(b"a", b"1234")
+    cache.put(b"b", b"1234")
+    cache.close()
+    # Closing records that a was used more recently than b.
+    assert cache.get(b"a") == b"1234"
+    cache.close()
+    cache.put(b"c", b"1234")
+    assert cache.get(b"a") == b"1234"
+    assert cache.get(b"b") is None
+    assert cache.get(b"c") == b"1234"
+    assert (cache.nr_entries, cache.size) == (2, 10)
+    # Entries larger than the cache are not added.
+    cache.put(b"d", b"1234567890")
+    assert cache.get(b"d") is None
+    assert cache.nr_entries == 2
+    cache.close()
+
+
+def test_disk_cache_processes(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.db"))
+    with ProcessPoolExecutor(2) as executor:
+        values = list(
+            executor.map(_put_and_get, [(cache, i) for i in range(1, 9)])
+        )
+    assert values == [bytes([i] * i) for i in range(1, 9)]
+    assert cache.nr_entries == 8
+    assert cache.size == sum(i + 1 for i in range(1, 9))
+    cache.close()
@@ -0,0 +1,69 @@
+""" Tests for freebandlib.element """
+
+import pickle
+from random import randint, seed
+
+import pytest
+from freebandlib.element import FreeBandElement
+from freebandlib.minword import normal_form
+from freebandlib.transducer import (
+    Transducer,
+    interval_transducer,
+    minimal_transducer,
+    transducer_canonical_encoding,
+    transducer_isomorphism,
+    treelike_transducer,
+)
+
+
+def test_free_band_element():
+    word = [0, 1, 0, 2, 0, 1, 0, 2]
+    x = FreeBandElement.from_word(word)
+    assert x == FreeBandElement(treelike_transducer(word))
+    assert x == FreeBandElement(interval_transducer(word))
+    assert x.nr_states == minimal_transducer(word).nr_states
+    assert x.content == frozenset([0, 1, 2])
+    assert x.key == transducer_canonical_encoding(minimal_transducer(word))
+    assert x.length == len(normal_form(word))
+    assert x.normal_form == normal_form(word)
+    assert repr(x) == f"FreeBandElement.from_word({normal_form(word)})"
+
+    # Modifying the returned values does not modify the element.
+    x.normal_form.append(3)
+    x.transducer.next_letter[0][0] = 3
+    assert x.normal_form == normal_form(word)
+    assert transducer_isomorphism(x.transducer, minimal_transducer(word))
+    with pytest.raises(AttributeError):
+        x.content = frozenset()  # type: ignore
+
+    empty = FreeBandElement.from_word([])
+    assert (empty.content, empty.length, empty.normal_form) == (set(), 0, [])
+    assert x * empty == x == empty * x
+    assert x != empty
+    assert x != word
+
+    with pytest.raises(RuntimeError):
+        FreeBandElement(Transducer(None, [], [], []))
+
+
+def test_free_band_element_random():
+    seed(49)
+    for _ in range(100):
+        u = [randint(0, 3) for _ in range(randint(0, 10))]
+        v = [randint(0, 3) for _ in range(randint(0, 10))]
+        x, y = FreeBandElement.from_word(u), FreeBandElement.from_word(v)
+        assert x * y == FreeBandElement.from_word(u + v)
+        assert (x * y).normal_form == normal_form(u + v)
+        assert (x == y) == (normal_form(u) == normal_form(v))
+        assert (x == y) <= (hash(x) == hash(y))
+        assert {x, y, x * y, FreeBandElement.from_word(u + v)} == {x, y, x * y}
+
+
+def test_free_band_element_pickle():
+    x = FreeBandElement.from_word([0, 1, 2, 0, 1, 0, 2, 3])
+    data = pickle.dumps(x)
+    assert len(data) < len(pickle.dumps(x.transducer))
+    y = pickle.loads(data)
+    assert x == y
+    assert hash(x) == hash(y)
+    assert x.normal_form == y.normal_form
@@ -5,8 +5,25 @@ from random import randint, random, shuffle
 from typing import List
 
 import pytest
-from freebandlib.equality import equal_in_free_band, equivalent_transducers
-from freebandlib.transducer import interval_transducer, treelike_transducer
+from freebandlib.cache import disable_cache, enable_cache
+from freebandlib.equality import (
+    EqualityIndex,
+    classify_transducers,
+    classify_words,
+    equal_in_free_band,
+    equivalent_transducers,
+    join_words,
+)
+from freebandlib.multiply import multiply
+from freebandlib.transducer import (
+    Transducer,
+    interval_transducer,
+    minimal_transducer,
+    transducer_fingerprint,
+    transducer_isomorphism,
+    transducer_minimize,
+    treelike_transducer,
+)
 from freebandlib.words import InputLetter, OutputWord, cont, word_function
 
 _sample_free_band_3 = [
@@ -299,6 +316,173 @@ def test_equivalent_transducers():
     check_equivalent_transducers(w2, w1)
 
 
+def test_equal_in_free_band_invariants():
+    assert equal_in_free_band([], [])
+    assert not equal_in_free_band([], [0])
+    assert not equal_in_free_band([0], [])
+    with pytest.raises(TypeError):
+        equal_in_free_band("abac", [0, 1, 0, 2])
+
+    for _ in range(500):
+        w1 = [randint(0, 3) for _ in range(randint(1, 12))]
+        w2 = [randint(0, 3) for _ in range(randint(1, 12))]
+        if random() < 0.5:
+            w2 = w1 + w1[randint(0, len(w1) - 1) :] + w1
+        expected = transducer_isomorphism(
+            transducer_minimize(interval_transducer(w1)),
+            transducer_minimize(interval_transducer(w2)),
+        )
+        assert equal_in_free_band(w1, w2) == expected
+        assert equal_in_free_band(w2, w1) == expected
+
+
+def test_equal_in_free_band_lockstep():
+    # These words agree on all of the invariants compared before the
+    # transducers are traversed.
+    w1, w2 = [1, 0, 1, 3, 1, 0, 3, 2], [1, 0, 3, 2, 2]
+    assert not equal_in_free_band(w1, w2)
+    assert not equal_in_free_band(w2, w1)
+
+    w1 = [randint(0, 7) for _ in range(300)]
+    w2 = w1 + w1[randint(0, 299) :] + w1
+    assert equal_in_free_band(w1, w2)
+    w2[randint(0, len(w2) - 1)] = 8
+    assert not equal_in_free_band(w1, w2)
+
+
+def test_equivalent_transducers_random():
+    for _ in range(200):
+        w1 = [randint(0, 3) for _ in range(randint(0, 10))]
+        w2 = [randint(0, 3) for _ in range(randint(0, 10))]
+        w3 = [randint(0, 3) for _ in range(randint(0, 10))]
+        product = multiply(interval_transducer(w1), treelike_transducer(w2))
+        t = interval_transducer(w1 + w2)
+        assert equivalent_transducers(product, t)
+        assert equivalent_transducers(t, product)
+        expected = transducer_isomorphism(
+            transducer_minimize(product),
+            transducer_minimize(interval_transducer(w3)),
+        )
+        t = interval_transducer(w3)
+        assert equivalent_transducers(product, t) == expected
+
+
+def test_equivalent_transducers_dead_states():
+    # The transition to the state 2 can never reach a terminal state, so is
+    # treated as undefined.
+    t1 = Transducer(
+        0,
+        [[1, 2], [None, None], [None, None]],
+        [[0, 1], [None, None], [None, None]],
+        [False, True, False],
+    )
+    t2 = Transducer(
+        0, [[1, None], [None, None]], [[0, None], [None, None]], [False, True]
+    )
+    assert equivalent_transducers(t1, t2)
+    assert equivalent_transducers(t2, t1)
+    assert not equivalent_transducers(t1, treelike_transducer([0]))
+    empty = Transducer(None, [], [], [])
+    assert equivalent_transducers(empty, empty)
+    assert not equivalent_transducers(empty, treelike_transducer([]))
+    assert not equivalent_transducers(treelike_transducer([]), t2)
+
+
+def test_equal_in_free_band_fingerprints():
+    for _ in range(100):
+        w1 = [randint(0, 3) for _ in range(randint(0, 10))]
+        w2 = [randint(0, 3) for _ in range(randint(0, 10))]
+        f1 = transducer_fingerprint(minimal_transducer(w1))
+        f2 = transducer_fingerprint(minimal_transducer(w2))
+        expected = equal_in_free_band(w1, w2)
+        assert equal_in_free_band(w1, w2, f1, f2) == expected
+        assert equal_in_free_band(w1, w2, f1) == expected
+    # Equal fingerprints are verified exactly.
+    assert not equal_in_free_band([0], [1], 0, 0)
+    assert not equal_in_free_band([0], [0], 0, 1)
+    w = [0, 1, 0, 2]
+    with pytest.raises(RuntimeError):
+        equal_in_free_band(
+            w,
+            w,
+            transducer_fingerprint(minimal_transducer(w), 128),
+            transducer_fingerprint(minimal_transducer(w)),
+        )
+
+
+def test_equal_in_free_band_fingerprints_cache():
+    # The result for mismatched fingerprints is not cached for the words.
+    enable_cache()
+    try:
+        assert not equal_in_free_band([0, 1], [0, 1], 0, 1)
+        assert equal_in_free_band([0, 1], [0, 1])
+    finally:
+        disable_cache()
+
+
+def test_classify_words():
+    words = [[randint(0, 2) for _ in range(randint(0, 7))] for _ in range(200)]
+    classes = list(classify_words(words))
+    assert len(classes) == len(words)
+    for i, x in enumerate(words):
+        for j, y in enumerate(words[:i]):
+            assert (classes[i] == classes[j]) == equal_in_free_band(x, y)
+    assert classes[0] == 0
+    assert max(classes) + 1 == len(set(classes))
+
+    assert list(classify_words(iter(words), processes=2, chunk_size=7)) == (
+        classes
+    )
+    transducers = [treelike_transducer(w) for w in words]
+    assert list(classify_transducers(transducers)) == classes
+    assert list(classify_words([])) == []
+    with pytest.raises(RuntimeError):
+        classify_words(words, chunk_size=0)
+
+
+def test_join_words():
+    words1 = [[randint(0, 2) for _ in range(randint(0, 6))] for _ in range(50)]
+    words2 = [[randint(0, 2) for _ in range(randint(0, 6))] for _ in range(50)]
+    expected = [
+        (i, j)
+        for j, y in enumerate(words2)
+        for i, x in enumerate(words1)
+        if equal_in_free_band(x, y)
+    ]
+    assert list(join_words(words1, words2)) == expected
+    assert list(join_words(words1, iter(words2), processes=2)) == expected
+    assert list(join_words([], words2)) == []
+
+
+def test_equality_index():
+    references = [
+        [randint(0, 2) for _ in range(randint(0, 6))] for _ in range(40)
+    ]
+    index = EqualityIndex(interval_transducer(w) for w in references)
+    assert len(index) == 40
+    for _ in range(100):
+        w = [randint(0, 3) for _ in range(randint(0, 6))]
+        expected = [
+            i for i, x in enumerate(references) if equal_in_free_band(x, w)
+        ]
+        assert index.find_word(w) == expected
+        assert index.find(treelike_transducer(w)) == expected
+    assert index.add(treelike_transducer([1, 0])) == 40
+    assert index.find_word([1, 0, 1, 0]) == [
+        i for i, x in enumerate(references) if equal_in_free_band(x, [1, 0])
+    ] + [40]
+
+    empty = EqualityIndex()
+    assert len(empty) == 0
+    assert empty.find_word([0, 1]) == []
+    assert empty.find(Transducer(None, [], [], [])) == []
+    empty.add(Transducer(None, [], [], []))
+    assert empty.find(Transducer(None, [], [], [])) == [0]
+    assert empty.find_word([]) == []
+    with pytest.raises(TypeError):
+        empty.find_word("ab")
+
+
 def test_inequal_in_free_band():
     for i, x in enumerate(_sample_free_band_3):
         for y in _sample_free_band_3[i + 1 :]:
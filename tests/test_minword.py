@@ -1,11 +1,29 @@
+import random
+import sys
+from random import randint
+
+import pytest
+
 from freebandlib import (
+    MinWordIndex,
+    compare_min_words,
+    iter_min_word,
     min_word,
+    min_word_length,
+    min_word_letter_counts,
+    min_word_slp,
+    min_words,
+    normal_form,
+    normal_forms,
+    sort_elements,
     transducer_minimize,
     treelike_transducer,
     interval_transducer,
+    minimal_transducer,
     equal_in_free_band,
+    transducer_index_spines,
 )
-from freebandlib.minword import Case, classify_case
+from freebandlib.minword import Case, classify_case, classify_cases
 
 
 def test_classify_case():
@@ -45,3 +63,181 @@ def test_min_word():
     t = transducer_minimize(interval_transducer(w))
     # assert equal_in_free_band(min_word(t), w)
     assert min_word(t) == w
+
+
+def test_min_word_deep_transducer():
+    # The old recursive implementation used one stack frame per letter in the
+    # content, so this exceeds the lowered recursion limit.
+    w = list(range(150))
+    t = transducer_minimize(interval_transducer(w))
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(100)
+    try:
+        assert min_word(t) == w
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+def test_min_word_random():
+    random.seed(1618033988749)
+    for _ in range(200):
+        w = [randint(0, 4) for _ in range(randint(1, 30))]
+        t = transducer_minimize(interval_transducer(w))
+        u = min_word(t)
+        assert len(u) <= len(w)
+        assert equal_in_free_band(u, w)
+        assert min_word(transducer_minimize(interval_transducer(u))) == u
+
+
+def test_iter_min_word():
+    random.seed(1618033988749)
+    for _ in range(200):
+        w = [randint(0, 5) for _ in range(randint(0, 40))]
+        t = transducer_minimize(interval_transducer(w))
+        assert list(iter_min_word(t)) == min_word(t)
+
+    w = [1, 2, 0, 2, 1, 2, 3, 4, 0, 4, 2]
+    letters = iter_min_word(transducer_minimize(interval_transducer(w)))
+    assert next(letters) == 1
+    assert next(letters) == 2
+    assert list(letters) == w[2:]
+
+
+def test_min_word_length_and_letter_counts():
+    random.seed(1618033988749)
+    for _ in range(200):
+        w = [randint(0, 5) for _ in range(randint(0, 40))]
+        t = transducer_minimize(interval_transducer(w))
+        u = min_word(t)
+        assert min_word_length(t) == len(u)
+        counts = min_word_letter_counts(t)
+        assert len(counts) == (max(w) + 1 if len(w) > 0 else 0)
+        assert counts == [u.count(a) for a in range(len(counts))]
+
+
+def test_min_word_slp():
+    random.seed(1618033988749)
+    for _ in range(200):
+        w = [randint(0, 5) for _ in range(randint(0, 40))]
+        t = transducer_minimize(interval_transducer(w))
+        u = min_word(t)
+        p = min_word_slp(t)
+        assert p.length == len(u)
+        assert p.expand() == u
+        assert list(p) == u
+        assert p.nr_rules <= t.nr_states * max(1, len(set(w)))
+
+    w = [1, 2, 0, 2, 1, 2, 3, 4, 0, 4, 2]
+    p = min_word_slp(transducer_minimize(interval_transducer(w)))
+    q = min_word_slp(transducer_minimize(treelike_transducer(w)))
+    assert p.word_hash() == q.word_hash()
+
+
+def test_min_word_index():
+    random.seed(1618033988749)
+    for _ in range(100):
+        w = [randint(0, 5) for _ in range(randint(0, 40))]
+        index = MinWordIndex(transducer_minimize(interval_transducer(w)))
+        u = min_word(index.transducer)
+        assert len(index) == len(u)
+        assert list(index) == u
+        assert [index[i] for i in range(len(u))] == u
+        assert [index[-i] for i in range(1, len(u) + 1)] == u[::-1]
+        for _ in range(10):
+            i, j = randint(-5, len(u) + 5), randint(-5, len(u) + 5)
+            assert index[i:j] == u[i:j]
+            assert index[i:j:2] == u[i:j:2]
+            assert index[j:i:-3] == u[j:i:-3]
+        with pytest.raises(IndexError):
+            index[len(u)]
+        with pytest.raises(IndexError):
+            index[-len(u) - 1]
+
+
+def test_classify_cases():
+    random.seed(1618033988749)
+    for _ in range(100):
+        w = [randint(0, 5) for _ in range(randint(0, 40))]
+        t = transducer_minimize(interval_transducer(w))
+        cases, ks, targets = classify_cases(t)
+        for q in range(t.nr_states):
+            if t.terminal[q]:
+                assert (cases[q], ks[q], targets[q]) == (None, 0, None)
+                continue
+            assert (cases[q], ks[q]) == classify_case(t, q)
+            if cases[q] is Case.II:
+                r = t.next_state[q][0]
+                for _ in range(ks[q]):
+                    r = t.next_state[r][1]
+                assert targets[q] == r
+            else:
+                assert targets[q] is None
+
+
+def test_classify_case_spine_index():
+    w = [1, 2, 0, 2, 1, 2, 3, 4, 0, 4, 2]
+    t = transducer_minimize(interval_transducer(w))
+    states = [q for q in range(t.nr_states) if not t.terminal[q]]
+    expected = [classify_case(t, q) for q in states]
+    transducer_index_spines(t)
+    assert [classify_case(t, q) for q in states] == expected
+    assert min_word(t) == w
+
+
+def test_compare_min_words():
+    random.seed(1618033988749)
+    words = [[randint(0, 3) for _ in range(randint(0, 12))] for _ in range(60)]
+    transducers = [transducer_minimize(interval_transducer(w)) for w in words]
+    keys = [(len(u), u) for u in map(min_word, transducers)]
+    for t1, key1 in zip(transducers, keys):
+        for t2, key2 in zip(transducers, keys):
+            assert compare_min_words(t1, t2) == (key1 > key2) - (key1 < key2)
+
+    w = [1, 2, 0, 2, 1, 2, 3, 4, 0, 4, 2]
+    t1 = transducer_minimize(interval_transducer(w))
+    t2 = transducer_minimize(treelike_transducer(w + w))
+    assert compare_min_words(t1, t2) == 0
+
+
+def test_sort_elements():
+    random.seed(1618033988749)
+    words = [[randint(0, 3) for _ in range(randint(0, 12))] for _ in range(60)]
+    transducers = [transducer_minimize(interval_transducer(w)) for w in words]
+    expected = sorted(map(min_word, transducers), key=lambda u: (len(u), u))
+    assert [min_word(t) for t in sort_elements(transducers)] == expected
+    unique = [u for i, u in enumerate(expected) if u not in expected[:i]]
+    assert [
+        min_word(t) for t in sort_elements(transducers, unique=True)
+    ] == unique
+
+
+def test_normal_form():
+    assert normal_form([]) == []
+    assert normal_form([0, 0, 0]) == [0]
+    random.seed(1618033988749)
+    words = [[randint(0, 4) for _ in range(randint(0, 30))] for _ in range(100)]
+    expected = [
+        min_word(transducer_minimize(interval_transducer(w))) for w in words
+    ]
+    assert [normal_form(w) for w in words] == expected
+    assert list(normal_forms(words)) == expected
+    assert list(normal_forms(iter([]))) == []
+
+
+def test_min_words():
+    random.seed(1618033988749)
+    base = [[randint(0, 5) for _ in range(randint(0, 25))] for _ in range(10)]
+    words = [
+        random.choice(base) + random.choice(base) + random.choice(base)
+        for _ in range(100)
+    ]
+    transducers = [minimal_transducer(w) for w in words]
+    expected = [min_word(t) for t in transducers]
+    for max_memo_size in (0, 1, 5, 50, 1 << 16):
+        assert min_words(transducers, max_memo_size) == expected
+    assert min_words(iter(transducers)) == expected
+    assert min_words([]) == []
+    assert min_words([minimal_transducer([])]) == [[]]
+
+    with pytest.raises(RuntimeError):
+        min_words(transducers, -1)
@@ -5,7 +5,14 @@ from typing import List
 
 import pytest
 
-from freebandlib.multiply import multiply
+from freebandlib.multiply import (
+    MultiplicationProfile,
+    multiply,
+    multiply_generators,
+    multiply_letter,
+    multiply_many,
+    multiply_scan,
+)
 from freebandlib.transducer import (
     StateId,
     Transducer,
@@ -421,3 +428,125 @@ def test_transducer_multiply4():
         0,
     ]
     check_multiply(w1, w2)
+
+
+def test_multiplication_profile():
+    w = [0, 1, 0, 2]
+    t = minimal_transducer(w)
+    profile = MultiplicationProfile(t)
+    assert profile.content == cont(w)
+    assert len(profile.spine0) == len(profile.spine1) == 4
+    assert profile.letters0 == [2, 1, 0, None]
+    assert profile.letters1 == [1, 0, 2, None]
+    assert profile.letters0[:-1] == t.traverse([0, 0, 0])
+    assert profile.letters1[:-1] == t.traverse([1, 1, 1])
+
+
+def test_multiply_with_profiles():
+    transducers = [minimal_transducer(w) for w in _sample_42_words[:10]]
+    profiles = [MultiplicationProfile(t) for t in transducers]
+    for x, tx, px in zip(_sample_42_words, transducers, profiles):
+        for y, ty, py in zip(_sample_42_words, transducers, profiles):
+            check_transducers_realize_same(
+                x + y, multiply(tx, ty, px, py), interval_transducer(x + y)
+            )
+
+
+def test_multiply_many():
+    words = list(_sample_42_more_words[:9])
+    transducers = [interval_transducer(w) for w in words]
+    product = [x for w in words for x in w]
+    assert transducer_isomorphism(
+        multiply_many(transducers), minimal_transducer(product)
+    )
+    assert transducer_isomorphism(
+        multiply_many(transducers, processes=2), minimal_transducer(product)
+    )
+    assert transducer_isomorphism(
+        multiply_many(transducers[:1]), minimal_transducer(words[0])
+    )
+    assert transducer_isomorphism(multiply_many([]), minimal_transducer([]))
+
+
+def test_multiply_scan():
+    words = list(_sample_42_words[:12])
+    prefixes = multiply_scan(interval_transducer(w) for w in words)
+    assert len(prefixes) == len(words)
+    product: OutputWord = []
+    for w, t in zip(words, prefixes):
+        product = product + w
+        assert transducer_isomorphism(t, minimal_transducer(product))
+    assert multiply_scan([]) == []
+
+
+def test_multiply_trivial_products():
+    empty = minimal_transducer([])
+    for w in _sample_42_more_words[:10]:
+        t = minimal_transducer(w)
+        for product in (
+            multiply(t, t),
+            multiply(t, minimal_transducer(w)),
+            multiply(t, empty),
+            multiply(empty, t),
+        ):
+            assert product is not t
+            assert transducer_isomorphism(product, t)
+        # The products do not share any lists with their arguments.
+        for product in (multiply(t, t), multiply(t, empty)):
+            product.next_state[product.initial][0] = None
+            product.next_letter[product.initial][0] = None
+            assert t.next_state[t.initial][0] is not None
+            assert t.next_letter[t.initial][0] is not None
+
+
+def test_multiply_subset_content():
+    x = [0, 1, 2, 3, 0, 3, 1, 3, 2, 1, 0, 0]
+    for y in ([1], [3, 0], [2, 1, 2], [1, 0, 3, 2, 1]):
+        check_multiply(x, y)
+        check_multiply(y, x)
+
+
+def test_multiply_letter():
+    for w in _sample_42_words + _sample_42_more_words + ([],):
+        t = minimal_transducer(w)
+        for a in range(7):
+            check_transducers_realize_same(
+                w + [a], multiply_letter(t, a), interval_transducer(w + [a])
+            )
+            check_transducers_realize_same(
+                [a] + w,
+                multiply_letter(t, a, "left"),
+                interval_transducer([a] + w),
+            )
+    with pytest.raises(RuntimeError):
+        multiply_letter(minimal_transducer([0]), 0, "middle")
+
+    # The product shares the transitions of the states of t, which are copied
+    # when they are modified by set_transition.
+    t = minimal_transducer([0, 1, 0, 2])
+    product = multiply_letter(t, 1)
+    assert product.next_state is not t.next_state
+    assert product.next_state[t.initial] is t.next_state[t.initial]
+    product.set_transition(t.initial, 0, None, None)
+    assert t.next_state[t.initial][0] is not None
+    check_transducers_realize_same(
+        [0, 1, 0, 2], t, interval_transducer([0, 1, 0, 2])
+    )
+
+
+def test_multiply_generators():
+    w = [0, 1, 2, 3, 0, 3, 1, 3, 2, 1, 0, 0]
+    t = interval_transducer(w)
+    right = multiply_generators(t)
+    left = multiply_generators(t, "left", 6)
+    assert len(right) == 4
+    assert len(left) == 6
+    for a, product in enumerate(right):
+        check_transducers_realize_same(
+            w + [a], product, interval_transducer(w + [a])
+        )
+    for a, product in enumerate(left):
+        check_transducers_realize_same(
+            [a] + w, product, interval_transducer([a] + w)
+        )
+    assert multiply_generators(minimal_transducer([])) == []
@@ -0,0 +1,40 @@
+""" Tests for freebandlib.slp """
+import pytest
+
+from freebandlib.slp import StraightLineProgram
+
+
+def test_straight_line_program():
+    # 0 -> 01, 1 -> (01)2(01), 2 -> (01)2(01)3(01)2(01)
+    p = StraightLineProgram(
+        [(None, (0, 1), None), (0, (2,), 0), (1, (3,), 1)], 2
+    )
+    w = [0, 1, 2, 0, 1, 3, 0, 1, 2, 0, 1]
+    assert p.nr_rules == 3
+    assert p.lengths == [2, 5, 11]
+    assert p.length == len(w)
+    assert p.expand() == w
+    assert list(p) == w
+
+    q = StraightLineProgram([(None, tuple(w), None)], 0)
+    assert q.expand() == w
+    assert q.word_hash() == p.word_hash()
+    assert q.word_hash() != StraightLineProgram(p.rules, 1).word_hash()
+
+
+def test_straight_line_program_empty():
+    p = StraightLineProgram([], None)
+    assert p.length == 0
+    assert p.expand() == []
+    assert (
+        p.word_hash() == StraightLineProgram([(None, (), None)], 0).word_hash()
+    )
+
+
+def test_straight_line_program_validate():
+    with pytest.raises(RuntimeError):
+        StraightLineProgram([(0, (0,), None)], 0)
+    with pytest.raises(RuntimeError):
+        StraightLineProgram([(None, (0,), 1), (None, (1,), None)], 1)
+    with pytest.raises(RuntimeError):
+        StraightLineProgram([(None, (0,), None)], 1)
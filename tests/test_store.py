@@ -0,0 +1,98 @@
+""" Tests for freebandlib.store """
+
+from random import randint, seed
+
+import pytest
+from freebandlib.multiply import multiply
+from freebandlib.store import ElementStore
+from freebandlib.transducer import (
+    Transducer,
+    interval_transducer,
+    minimal_transducer,
+    transducer_isomorphism,
+    transducer_minimize,
+    treelike_transducer,
+)
+
+
+def test_element_store_add():
+    store = ElementStore()
+    assert store.nr_states == 1
+    assert store.add_word([]) == store.empty_word
+    root = store.add_word([0, 1, 0, 2])
+    assert store.nr_states == 6
+    assert store.add(treelike_transducer([0, 1, 0, 2])) == root
+    assert store.add(interval_transducer([0, 1, 0, 1, 0, 2])) == root
+    assert store.nr_states == 6
+    assert store.refcount(root) == 3
+    assert transducer_isomorphism(
+        store.transducer(root), minimal_transducer([0, 1, 0, 2])
+    )
+    # The states shared with [0, 1, 0, 2] are not added again.
+    store.add_word([0, 1, 0, 3])
+    assert store.nr_states == 9
+
+    with pytest.raises(RuntimeError):
+        store.add(Transducer(None, [], [], []))
+    with pytest.raises(RuntimeError):
+        store.transducer(100)
+
+
+def test_element_store_multiply():
+    seed(2236067977)
+    store = ElementStore()
+    words = [[randint(0, 4) for _ in range(randint(0, 12))] for _ in range(20)]
+    roots = [store.add_word(w) for w in words]
+    for _ in range(200):
+        i, j = randint(0, 19), randint(0, 19)
+        root = store.multiply(roots[i], roots[j])
+        assert root == store.add_word(words[i] + words[j])
+        expected = transducer_minimize(
+            multiply(minimal_transducer(words[i]), minimal_transducer(words[j]))
+        )
+        assert transducer_isomorphism(store.transducer(root), expected)
+    root = roots[0]
+    assert store.multiply(root, root) == root
+    assert store.multiply(root, store.empty_word) == root
+    assert store.multiply(store.empty_word, root) == root
+    with pytest.raises(RuntimeError):
+        store.multiply(root, -1)
+
+
+def test_element_store_collect():
+    store = ElementStore()
+    x = store.add_word([0, 1, 0, 2])
+    y = store.add_word([2, 1, 0])
+    xy = store.multiply(x, y)
+    nr_states = store.nr_states
+    assert store.collect() == 0
+
+    store.release(xy)
+    assert store.refcount(xy) == 0
+    with pytest.raises(RuntimeError):
+        store.release(xy)
+    nr_reclaimed = store.collect()
+    assert nr_reclaimed > 0
+    assert store.nr_states == nr_states - nr_reclaimed
+    assert transducer_isomorphism(
+        store.transducer(x), minimal_transducer([0, 1, 0, 2])
+    )
+    assert transducer_isomorphism(
+        store.transducer(y), minimal_transducer([2, 1, 0])
+    )
+    with pytest.raises(RuntimeError):
+        store.transducer(xy)
+
+    # The ids of reclaimed states are reused.
+    old_xy = xy
+    xy = store.multiply(x, y)
+    assert store.nr_states == nr_states
+    assert xy == old_xy
+    assert transducer_isomorphism(
+        store.transducer(xy), minimal_transducer([0, 1, 0, 2, 1, 0])
+    )
+
+    for root in (x, y, xy):
+        store.release(root)
+    assert store.collect() == nr_states - 1
+    assert store.nr_states == 1
@@ -1,14 +1,24 @@
 """ Tests for freebandlib.transducer """
 import itertools
-from random import randint, random, shuffle
+import operator
+import os
+import pickle
+import subprocess
+import sys
+from random import randint, random, seed, shuffle
 from typing import List, Optional
 
 import pytest
+from freebandlib.multiply import multiply
 from freebandlib.transducer import (
     StateId,
     Transducer,
     interval_transducer,
     minimal_transducer,
+    transducer_canonical_encoding,
+    transducer_fingerprint,
+    transducer_fingerprints,
+    transducer_from_bytes,
     transducer_connected_states,
     transducer_isomorphism,
     transducer_minimize,
@@ -16,6 +26,10 @@ from freebandlib.transducer import (
     transducer_trim,
     treelike_transducer,
     transducer_induced_subtransducer,
+    transducer_index_spines,
+    transducer_precompute_q,
+    transducer_spine_state,
+    transducer_to_bytes,
 )
 from freebandlib.words import (
     InputLetter,
@@ -248,6 +262,17 @@ def test_minimal_transducer_abac():
     assert t.traverse([0, 0, 0]) == [2, 1, 0]
 
 
+def test_minimal_transducer_random():
+    seed(1414213562)
+    assert minimal_transducer([]).nr_states == 1
+    for _ in range(200):
+        w = [randint(0, 4) for _ in range(randint(0, 30))]
+        t = minimal_transducer(w)
+        u = transducer_minimize(interval_transducer(w))
+        assert t.nr_states == u.nr_states
+        assert transducer_isomorphism(t, u)
+
+
 def test_treelike_transducer_abac_realize():
     w = [0, 1, 0, 2]
     t = treelike_transducer(w)
@@ -319,6 +344,186 @@ def test_transducer_trim():
     assert transducer_isomorphism(t, transducer_trim(t))
 
 
+def test_transducer_canonical_encoding():
+    encode = transducer_canonical_encoding
+    assert encode(Transducer(None, [], [], [])) == ()
+    assert encode(minimal_transducer([])) == (1, -1, -1, -1, -1)
+    expected = (0, 0, 1, 0, 1, 1, -1, -1, -1, -1)
+    assert encode(minimal_transducer([0])) == expected
+
+    seed(2718281828)
+    for _ in range(100):
+        w1 = [randint(0, 3) for _ in range(randint(0, 10))]
+        w2 = [randint(0, 3) for _ in range(randint(0, 10))]
+        t1, t2 = minimal_transducer(w1), minimal_transducer(w2)
+        u1 = transducer_minimize(treelike_transducer(w1))
+        assert encode(t1) == encode(u1)
+        assert (encode(t1) == encode(t2)) == transducer_isomorphism(t1, t2)
+
+
+def test_transducer_fingerprints():
+    seed(1732050807)
+    for _ in range(100):
+        w1 = [randint(0, 3) for _ in range(randint(0, 10))]
+        w2 = [randint(0, 3) for _ in range(randint(0, 10))]
+        t1, t2 = minimal_transducer(w1), minimal_transducer(w2)
+        u1 = transducer_minimize(treelike_transducer(w1))
+        assert transducer_fingerprint(t1) == transducer_fingerprint(u1)
+        assert (
+            transducer_fingerprint(t1, 128) == transducer_fingerprint(t2, 128)
+        ) == transducer_isomorphism(t1, t2)
+
+        # The states of the interval transducer that are merged by
+        # minimization have the same fingerprints.
+        t = interval_transducer(w1)
+        fingerprints = transducer_fingerprints(t)
+        connected = transducer_connected_states(t)
+        expected = set(transducer_fingerprints(t1))
+        assert {fingerprints[q] for q in connected} == expected
+        assert all(0 <= x < 2**64 for x in fingerprints)
+
+    assert transducer_fingerprint(Transducer(None, [], [], [])) == 0
+    with pytest.raises(RuntimeError):
+        transducer_fingerprints(minimal_transducer([0]), 32)
+    with pytest.raises(RuntimeError):
+        transducer_fingerprint(Transducer(None, [], [], []), 32)
+
+
+def test_transducer_fingerprint_hash_seed():
+    # The fingerprints must not depend on the seed of the built-in hash.
+    code = (
+        "from freebandlib.transducer import minimal_transducer, "
+        "transducer_fingerprint; "
+        "print(transducer_fingerprint(minimal_transducer([0, 1, 0, 2]), 128))"
+    )
+    outputs = set()
+    for hash_seed in ("1", "2"):
+        env = dict(os.environ, PYTHONHASHSEED=hash_seed)
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            check=True,
+            env=env,
+            text=True,
+        )
+        outputs.add(int(result.stdout))
+    assert outputs == {
+        transducer_fingerprint(minimal_transducer([0, 1, 0, 2]), 128)
+    }
+
+
+def test_transducer_bytes():
+    seed(48)
+    transducers = [
+        Transducer(None, [], [], []),
+        Transducer(None, [[None, None]], [[None, None]], [False]),
+        minimal_transducer([]),
+    ]
+    for _ in range(50):
+        word = [randint(0, 100) for _ in range(randint(1, 20))]
+        transducers.append(interval_transducer(word))
+        transducers.append(minimal_transducer(word))
+    for t in transducers:
+        s = transducer_from_bytes(transducer_to_bytes(t))
+        assert s.initial == t.initial
+        assert s.next_state == t.next_state
+        assert s.next_letter == t.next_letter
+        assert s.terminal == t.terminal
+
+    t = minimal_transducer([0, 1, 0, 2])
+    assert len(transducer_to_bytes(t)) == 2 + 5 * (t.nr_states - 1) + 1
+    data = transducer_to_bytes(t)
+    for bad_data in [b"", data[:-1], data + bytes([0])]:
+        with pytest.raises(RuntimeError):
+            transducer_from_bytes(bad_data)
+
+
+def _old_pickle(transducer: Transducer) -> bytes:
+    # Return a pickle of transducer as made by version 0.0.1, whose
+    # transducers only have the attributes below.
+    old = Transducer.__new__(Transducer)
+    for name in ("initial", "next_state", "next_letter", "terminal", "label"):
+        setattr(old, name, getattr(transducer, name))
+    return pickle.dumps(old)
+
+
+def test_transducer_old_pickle():
+    t = pickle.loads(_old_pickle(minimal_transducer([0, 1, 0, 2])))
+    assert "version" not in vars(t)
+    assert t.version == 0
+    state = t.add_state([None, None], [None, None], True)
+    t.set_transition(state, 0, None, None)
+    t.set_terminal(state, False)
+    assert t.version == 3
+    assert transducer_isomorphism(
+        transducer_trim(t), minimal_transducer([0, 1, 0, 2])
+    )
+
+    # The spine helpers and multiply use the spine index, if any.
+    x = pickle.loads(_old_pickle(minimal_transducer([0, 1])))
+    y = pickle.loads(_old_pickle(minimal_transducer([2, 1])))
+    assert x.spine_index is None
+    assert transducer_precompute_q(x.initial, 0, x) == [3, 1, 0]
+    assert transducer_isomorphism(
+        transducer_minimize(multiply(x.copy(), y)),
+        minimal_transducer([0, 1, 2, 1]),
+    )
+
+
+def test_transducer_copy():
+    t = minimal_transducer([0, 1, 0, 2])
+    initial = t.initial
+    assert initial is not None
+    child0, child1 = t.next_state[initial]
+    letter0, letter1 = t.next_letter[initial]
+    transducer_index_spines(t)
+    u = t.copy()
+    v = u.copy()
+    # The copies share the transitions of every state until they are
+    # modified, but not the lists of states.
+    assert u.next_state is not t.next_state
+    assert all(map(operator.is_, u.next_state, t.next_state))
+    assert u.spine_index is t.spine_index
+    assert u.version == 0
+
+    u.set_transition(initial, 0, child1, 5)
+    assert u.next_state[initial] == [child1, child1]
+    assert u.next_letter[initial] == [5, letter1]
+    assert u.spine_index is None
+    assert u.version == 1
+    # Only the modified row is copied.
+    assert u.next_state[child0] is t.next_state[child0]
+    for w in (t, v):
+        assert w.next_state[initial] == [child0, child1]
+        assert w.next_letter[initial] == [letter0, letter1]
+    assert t.spine_index is not None
+
+    # Modifying the original does not modify its copies either.
+    t.set_transition(child0, 1, None, None)
+    t.set_terminal(0, False)
+    state = t.add_state([0, 0], [1, 1], True)
+    assert (t.nr_states, u.nr_states, v.nr_states) == (state + 1, state, state)
+    for w in (u, v):
+        assert w.next_state[child0][1] is not None
+        assert w.terminal[0]
+    assert t.next_state[child0][1] is None
+    assert not t.terminal[0]
+
+    # Rows added after copying, or already copied, are not copied again.
+    row = t.next_state[state]
+    t.set_transition(state, 0, None, None)
+    assert t.next_state[state] is row
+    row = t.next_state[child0]
+    t.set_transition(child0, 0, None, None)
+    assert t.next_state[child0] is row
+
+    # Writing to the lists of states of a copy does not modify the original.
+    u.terminal[0] = False
+    u.next_state.append([None, None])
+    assert v.terminal[0]
+    assert v.nr_states == state
+
+
 def test_transducer_isomorphism():
     t = Transducer(None, [], [], [])
     assert transducer_isomorphism(t, t)
@@ -373,3 +578,41 @@ def test_transducer_isomorphism():
 def test_transducer_minimize():
     t = Transducer(None, [], [], [])
     assert transducer_isomorphism(t, transducer_minimize(t))
+
+
+def test_transducer_index_spines():
+    for w in ([], [0, 1, 0, 2], [0, 1, 2, 3, 0, 3, 1, 3, 2, 1, 0, 0]):
+        for t in (treelike_transducer(w), minimal_transducer(w)):
+            spines = {
+                (state, letter): transducer_precompute_q(state, letter, t)
+                for state in range(t.nr_states)
+                for letter in [0, 1]
+            }
+            assert t.spine_index is None
+            index = transducer_index_spines(t)
+            assert t.spine_index is index
+            for (state, letter), spine in spines.items():
+                assert index.depth[letter][state] == len(spine) - 1
+                assert transducer_precompute_q(state, letter, t) == spine
+                for k in range(len(spine) + 2):
+                    expected = spine[k] if k < len(spine) else None
+                    assert index.spine_state(state, letter, k) == expected
+                    assert transducer_spine_state(state, letter, k, t) == (
+                        expected
+                    )
+            t.spine_index = None
+            for (state, letter), spine in spines.items():
+                for k in range(len(spine) + 2):
+                    expected = spine[k] if k < len(spine) else None
+                    assert transducer_spine_state(state, letter, k, t) == (
+                        expected
+                    )
+
+    t = minimal_transducer([0, 1])
+    transducer_index_spines(t)
+    t.add_state([None, None], [None, None], True)
+    assert t.spine_index is None
+
+    t = Transducer(0, [[0, 0]], [[0, 0]], [True])
+    with pytest.raises(RuntimeError):
+        transducer_index_spines(t)
@@ -1,6 +1,13 @@
 """ Tests for freebandlib.words """
 
-from freebandlib.words import pref_ltof, suff_ftol
+from freebandlib.words import (
+    first_occurrence_order,
+    last_occurrence_order,
+    pref_ltof,
+    suff_ftol,
+    word_from_bytes,
+    word_to_bytes,
+)
 
 import pytest
 
@@ -17,3 +24,21 @@ def test_suff_ltof():
         suff_ftol("abac")
 
     assert suff_ftol([0, 1, 0, 2]) == ([0, 2], 1)
+
+
+def test_occurrence_orders():
+    assert first_occurrence_order([]) == []
+    assert last_occurrence_order([]) == []
+    assert first_occurrence_order([0, 1, 0, 2, 1]) == [0, 1, 2]
+    assert last_occurrence_order([0, 1, 0, 2, 1]) == [0, 2, 1]
+    assert first_occurrence_order([2, 2, 1]) == [2, 1]
+    assert last_occurrence_order([2, 2, 1]) == [2, 1]
+
+
+def test_word_bytes():
+    assert word_to_bytes([]) == b""
+    assert word_to_bytes([0, 1, 63]) == bytes([0, 2, 126])
+    for word in [[], [0, 1, 0, 2], [64, 1000000, 0], [-1, -65]]:
+        assert word_from_bytes(word_to_bytes(word)) == word
+    with pytest.raises(RuntimeError):
+        word_from_bytes(bytes([0, 128]))